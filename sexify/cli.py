@@ -1,10 +1,19 @@
 import click
 import sys
 import os
-from .core.downloader import Downloader, DownloadRequest
+import time
+from .core.downloader import Downloader
+from .core.jobs import (build_request, run_requests, resolve_quality, journaled_requests,
+                        read_url_file, enumerate_requests, download_all)
+from .core.journal import JobJournal
+from .core.library import LibraryIndex
+from .core.retry import reset_retry_budget
+from .core.syncstate import PlaylistSyncState, DOWNLOADED, PRESENT, FAILED, REMOVED
 from .services.spotify import SpotifyClient
 from .utils.analysis import analyze_track
 from .core.config import config
+from .core.server import serve as serve_jobs
+from .constants import SCAN_WORKERS, SERVE_HOST, SERVE_PORT
 from .utils.logger import log_info, log_error, log_success
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
@@ -29,129 +38,162 @@ def cli():
     pass
 
 @cli.command('download', context_settings=CONTEXT_SETTINGS)
-@click.argument('url')
+@click.argument('urls', nargs=-1)
+@click.option('--from-file', '-f', 'url_file', type=click.Path(exists=True, dir_okay=False), help='Read URLs from a file, one per line')
 @click.option('--service', '-s', default=lambda: config.get('service', 'tidal'), help='Download service')
 @click.option('--quality', '-q', default=None, help='Audio quality (HI_RES_LOSSLESS, LOSSLESS, HIGH, NORMAL, LOW)')
 @click.option('--output', '-o', default=lambda: config.get('output_dir'), help='Output directory')
 @click.option('--lyrics/--no-lyrics', default=lambda: config.get('embed_lyrics', True), help='Embed lyrics')
 @click.option('--cover-max/--no-cover-max', default=lambda: config.get('embed_max_quality_cover', True), help='Embed max quality cover')
-def download(url, service, quality, output, lyrics, cover_max):
-    """Download track, album, or playlist from Spotify URL."""
+@click.option('--speculative/--no-speculative', default=lambda: config.get('speculative_resolve', False), help='Resolve all services concurrently, best ready one wins')
+@click.option('--balance/--no-balance', default=False, help='Spread tracks across all services that deliver the requested quality')
+@click.option('--resume', is_flag=True, help='Resume the last interrupted download (of URL, if given)')
+def download(urls, url_file, service, quality, output, lyrics, cover_max, speculative, balance, resume):
+    """Download tracks, albums, or playlists from one or more Spotify URLs."""
+    reset_retry_budget()
+
+    journal = JobJournal()
+    downloader = Downloader()
+    downloader.journal = journal
+
+    urls = list(urls) + (read_url_file(url_file) if url_file else [])
+    if resume:
+        run = journal.last_unfinished(" ".join(urls) or None)
+        if not run:
+            log_error("Nothing to resume", 'sexify')
+            sys.exit(1)
+        run_id, source, options = run
+        balance = options.get('balance', False)
+        download_requests = journaled_requests(journal, run_id)
+        log_info(f"Resuming {source}: {len(download_requests)} tracks left", 'sexify')
+    else:
+        if not urls:
+            log_error("Missing URL (or use --from-file / --resume)", 'sexify')
+            sys.exit(1)
+
+        quality = resolve_quality(service, quality)
 
-    if not quality:
-        quality = config.get(f"{service}.quality") or "LOSSLESS"
+        log_info(f"Starting download using {service.upper()} (Quality: {quality})", 'sexify')
+
+        options = dict(service=service, quality=quality, output=output, lyrics=lyrics,
+                       cover_max=cover_max, speculative=speculative)
+        # One authenticated Spotify client for every URL
+        download_requests, duplicate_count = enumerate_requests(downloader.spotify, urls, options)
+        if not download_requests:
+            log_error("No tracks found to download.", 'sexify')
+            sys.exit(1)
+        if duplicate_count:
+            log_info(f"Skipping {duplicate_count} tracks requested more than once", 'sexify')
+        log_info(f"Found {len(download_requests)} tracks. Starting download...", 'sexify')
+
+        run_id = journal.start_run(" ".join(urls), dict(options, balance=balance))
+        journal.add(run_id, download_requests)
+
+    results, present_count = download_all(downloader, download_requests, balance)
+    success_count = sum(1 for ok in results if ok)
+    fail_count = len(results) - success_count
+    journal.finish_run(run_id)
+    log_success(f"Download complete. Success: {success_count}, Failed: {fail_count}, Skipped: {present_count}", 'sexify')
+
+# Alias: dl -> download
+cli.add_command(download, name='dl')
+
+@cli.command('sync', context_settings=CONTEXT_SETTINGS)
+@click.argument('url')
+@click.option('--service', '-s', default=lambda: config.get('service', 'tidal'), help='Download service')
+@click.option('--quality', '-q', default=None, help='Audio quality (HI_RES_LOSSLESS, LOSSLESS, HIGH, NORMAL, LOW)')
+@click.option('--output', '-o', default=lambda: config.get('output_dir'), help='Output directory')
+@click.option('--lyrics/--no-lyrics', default=lambda: config.get('embed_lyrics', True), help='Embed lyrics')
+@click.option('--cover-max/--no-cover-max', default=lambda: config.get('embed_max_quality_cover', True), help='Embed max quality cover')
+@click.option('--balance/--no-balance', default=False, help='Spread tracks across all services that deliver the requested quality')
+@click.option('--prune/--no-prune', default=False, help='Delete files of tracks removed from the playlist')
+def sync(url, service, quality, output, lyrics, cover_max, balance, prune):
+    """Mirror a Spotify playlist, downloading only tracks added since the last sync."""
+    reset_retry_budget()
+    quality = resolve_quality(service, quality)
 
-    log_info(f"Starting download using {service.upper()} (Quality: {quality})", 'sexify')
-    
     spotify = SpotifyClient()
     parsed = spotify.parse_url(url)
-    if not parsed:
-        log_error("Invalid Spotify URL", 'sexify')
+    if not parsed or parsed['type'] != 'playlist':
+        log_error("Sync needs a Spotify playlist URL", 'sexify')
         sys.exit(1)
-        
-    downloader = Downloader()
-    
-    items = []
-    is_playlist = False
-    playlist_name = ""
-    
-    if parsed['type'] == 'track':
-        track = spotify.get_track(parsed['id'])
-        if track: items.append(track)
-        else: log_error("Track not found", 'spotify')
-        
-    elif parsed['type'] == 'album':
-        log_info("Fetching album tracks...", 'spotify')
-        items = spotify.get_album_tracks(parsed['id'])
-        
-    elif parsed['type'] == 'playlist':
-        log_info("Fetching playlist tracks...", 'spotify')
-        playlist_info = spotify.get_playlist(parsed['id'])
-        playlist_name = playlist_info.get('name', 'Playlist') if playlist_info else 'Playlist'
-        is_playlist = True
-        log_info(f"Playlist: {playlist_name}", 'spotify')
-        items = spotify.get_playlist_tracks(parsed['id'])
-    
-    elif parsed['type'] == 'isrc':
-        log_info(f"Downloading by ISRC: {parsed['id']}", 'sexify')
-        items.append({
-            'id': '',
-            'name': 'Unknown',
-            'artists': [{'name': 'Unknown'}],
-            'album': {'name': '', 'artists': [], 'release_date': '', 'images': [], 'total_tracks': 1},
-            'external_ids': {'isrc': parsed['id']},
-            'track_number': 1,
-            'disc_number': 1
-        })
-        
-    if not items:
-        log_error("No tracks found to download.", 'sexify')
+
+    playlist_id = parsed['id']
+    playlist_info = spotify.get_playlist(playlist_id)
+    if not playlist_info:
+        log_error("Playlist not found", 'spotify')
         sys.exit(1)
+    playlist_name = playlist_info.get('name', 'Playlist')
+    snapshot_id = playlist_info.get('snapshot_id', '')
 
-    
-    if parsed['type'] == 'album':
-        album_info = spotify.get_album(parsed['id'])
-        if album_info:
-            log_info(f"Album: {album_info.get('name')} by {', '.join([a['name'] for a in album_info.get('artists', [])])}", 'spotify')
-            for item in items:
-                item['album'] = {
-                    'name': album_info.get('name', ''),
-                    'artists': album_info.get('artists', []),
-                    'release_date': album_info.get('release_date', ''),
-                    'images': album_info.get('images', []),
-                    'total_tracks': album_info.get('total_tracks', 0)
-                }
-                if not item.get('external_ids'):
-                    full_track = spotify.get_track(item.get('id'))
-                    if full_track:
-                        item['external_ids'] = full_track.get('external_ids', {})
-        
-    log_info(f"Found {len(items)} tracks. Starting download...", 'sexify')
-
-    
-    success_count = 0
-    fail_count = 0
-    
-    total_tracks = len(items)
-    for i, item in enumerate(items):
-        artists = item.get('artists', [])
-        artist_name = ", ".join([a['name'] for a in artists])
-        album = item.get('album', {})
-        
-        req = DownloadRequest(
-            isrc=item.get('external_ids', {}).get('isrc', ''),
-            service=service,
-            spotify_id=item.get('id', ''),
-            track_name=item.get('name', ''),
-            artist_name=artist_name,
-            album_name=album.get('name', ''),
-            album_artist=", ".join([a['name'] for a in album.get('artists', [])]),
-            release_date=album.get('release_date', ''),
-            cover_url=album.get('images', [{}])[0].get('url', '') if album.get('images') else '',
-            output_dir=output,
-            audio_format=quality,
-            filename_format=config.get('filename_template', '{title} - {artist}'),
-            track_number=item.get('track_number', 0),
-            total_tracks=album.get('total_tracks', 0),
-            disc_number=item.get('disc_number', 1),
-            position=i+1,
-            embed_lyrics=lyrics,
-            embed_max_quality_cover=cover_max,
-            is_playlist=is_playlist,
-            playlist_name=playlist_name
-        )
+    state = PlaylistSyncState()
+    known = state.tracks(playlist_id)
+    prune_pending = prune and any(s == REMOVED for _, _, s in known.values())
+    if (snapshot_id and state.snapshot(playlist_id) == snapshot_id
+            and not state.has_failures(playlist_id) and not prune_pending):
+        log_success(f"{playlist_name}: up to date", 'sexify')
+        return
 
-        
-        log_info(f"Processing: [{i+1}/{total_tracks}] {artist_name} - {req.track_name}", 'sexify')
-        if downloader.download_track(req):
-            success_count += 1
+    log_info(f"Syncing playlist: {playlist_name}", 'spotify')
+    items = spotify.get_playlist_tracks(playlist_id)
+    current = {item['id']: (i, item) for i, item in enumerate(items) if item.get('id')}
+    added = [(i, item) for track_id, (i, item) in current.items()
+             if known.get(track_id, ('', '', ''))[2] not in (DOWNLOADED, PRESENT)]
+    removed = [track_id for track_id, (_, _, s) in known.items() if track_id not in current and s != REMOVED]
+    log_info(f"Added: {len(added)}, Removed: {len(removed)}, Unchanged: {len(current) - len(added)}", 'sexify')
+
+    downloader = Downloader()
+    options = dict(service=service, quality=quality, output=output, lyrics=lyrics,
+                   cover_max=cover_max, speculative=config.get('speculative_resolve', False))
+    sync_requests = [build_request(item, i + 1, options, playlist_name) for i, item in added]
+    paths = {id(req): os.path.join(*downloader.build_output_path(req)) for req in sync_requests}
+
+    def owned(req) -> bool:
+        # Written by an earlier sync of this playlist (a removed track re-added, a failed retag)
+        _, path, s = known.get(req.spotify_id, ('', '', ''))
+        return s in (DOWNLOADED, FAILED, REMOVED) and path == paths[id(req)]
+
+    pending, present_count = downloader.preflight(sync_requests)
+    pending_ids = {id(req) for req in pending}
+    for req in sync_requests:
+        if id(req) not in pending_ids:
+            state.set_track(playlist_id, req.spotify_id, req.isrc, paths[id(req)],
+                            DOWNLOADED if owned(req) else PRESENT)
+
+    existed = {id(req) for req in pending if os.path.exists(paths[id(req)])}
+    outcomes = run_requests(downloader, pending, balance)
+    downloader.wait_for_tagging()
+    # Outcomes resolve once each track is tagged: a failed tag write is retried next sync
+    results = [outcome.result() for outcome in outcomes]
+    for req, ok in zip(pending, results):
+        if not ok:
+            track_state = FAILED
+        elif id(req) in existed and not owned(req):
+            track_state = PRESENT
         else:
-            fail_count += 1
-            
-    log_success(f"Download complete. Success: {success_count}, Failed: {fail_count}", 'sexify')
+            track_state = DOWNLOADED
+        state.set_track(playlist_id, req.spotify_id, req.isrc, paths[id(req)], track_state)
 
-# Alias: dl -> download
-cli.add_command(download, name='dl')
+    state.mark_removed(playlist_id, removed)
+    pruned = 0
+    if prune:
+        # REMOVED rows are files this playlist's syncs wrote; another playlist may share one
+        to_prune = {track_id: path for track_id, (_, path, s) in state.tracks(playlist_id).items()
+                    if s == REMOVED and path and not state.path_in_use(path, playlist_id, track_id)}
+        for path in to_prune.values():
+            if os.path.exists(path):
+                os.remove(path)
+                pruned += 1
+        downloader.library.remove(to_prune.values())
+        state.forget(playlist_id, to_prune)
+
+    state.set_snapshot(playlist_id, playlist_name, snapshot_id)
+    success_count = sum(1 for ok in results if ok)
+    log_success(
+        f"Sync complete. Downloaded: {success_count}, Failed: {len(results) - success_count}, "
+        f"Already present: {present_count}, Removed: {len(removed)}, Pruned: {pruned}",
+        'sexify'
+    )
 
 @cli.command(context_settings=CONTEXT_SETTINGS)
 @click.argument('path', type=click.Path(exists=True))
@@ -171,6 +213,28 @@ def analyze(path):
     else:
         click.echo("Failed to analyze file.")
 
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', '-w', default=SCAN_WORKERS, show_default=True, help='Parallel tag readers')
+def scan(path, workers):
+    """Index a music library so existing tracks are skipped instantly."""
+    log_info(f"Scanning {path}...", 'sexify')
+    start = time.time()
+    stats = LibraryIndex().scan(path, workers=workers)
+    log_success(
+        f"Scan complete in {time.time() - start:.1f}s. Files: {stats['files']}, "
+        f"Indexed: {stats['indexed']}, Unchanged: {stats['unchanged']}, "
+        f"Removed: {stats['removed']}, Unreadable: {stats['unreadable']}",
+        'sexify'
+    )
+
+@cli.command(context_settings=CONTEXT_SETTINGS)
+@click.option('--host', default=SERVE_HOST, show_default=True, help='Address to listen on')
+@click.option('--port', '-p', default=SERVE_PORT, show_default=True, help='Port to listen on')
+def serve(host, port):
+    """Run a resident downloader that takes jobs over a local HTTP API."""
+    serve_jobs(host, port)
+
 def main():
     cli()
 
@@ -9,6 +9,54 @@ STREAM_TIMEOUT = 15
 AUTH_TIMEOUT = 10
 SEARCH_TIMEOUT = 15  # For search/API requests
 COVER_TIMEOUT = 30  # For cover art downloads
+SEGMENT_TIMEOUT = 60  # Per DASH segment
+QOBUZ_URL_TIMEOUT = 30  # For Qobuz download-URL providers
+
+# Adaptive per-host timeouts (fixed timeouts above act as ceilings)
+LATENCY_WINDOW = 50  # Recent samples kept per endpoint
+LATENCY_MIN_SAMPLES = 5  # Samples needed before timeouts are learned
+ADAPTIVE_TIMEOUT_MULTIPLIER = 4  # Timeout = p99 latency x multiplier
+ADAPTIVE_CONNECT_TIMEOUT = 3.05  # Connect ceiling, also for hosts without history
+ADAPTIVE_CONNECT_FLOOR = 0.3
+ADAPTIVE_READ_FLOOR = 2.0
+LATENCY_ENDPOINT_DEPTH = 3  # Path segments that tell endpoints on one host apart
+
+# Shared connection pool
+POOL_MAX_HOSTS = 32  # Hosts kept in the keep-alive pool
+SONGLINK_CACHE_SIZE = 512  # Song.link lookups remembered per process
+
+# Artwork caching
+COVER_CACHE_BYTES = 64 * 1024 * 1024  # In-memory tag cover bytes per process
+APPLE_BASE_CACHE_SIZE = 256  # Apple Music page -> artwork base URL entries
+ARTWORK_NEGATIVE_TTL = 7 * 24 * 3600  # Re-check missing artwork sizes weekly
+APPLE_BASE_TTL = 30 * 24 * 3600  # Apple artwork base URLs are stable
+TAG_COVER_SIZE = 1000  # Embedded cover size in pixels
+TAG_COVER_QUALITY = 90  # JPEG quality for locally derived tag covers
+
+# Lyrics caching
+LYRICS_TTL = 90 * 24 * 3600  # Found lyrics
+LYRICS_NEGATIVE_TTL = 7 * 24 * 3600  # Tracks without lyrics are re-checked weekly
+LYRICS_WORKERS = 8  # Concurrent LRCLIB lookups (four strategies per track)
+LYRICS_PREFETCH_WORKERS = 4  # Tracks whose lyrics are fetched ahead of tagging
+LYRICS_PREFETCH_AHEAD = 8  # Queued tracks ahead of the current one whose lyrics are prefetched
+
+# Tagging
+FLAC_TAG_PADDING = 128 * 1024  # Padding left after single-pass tag writes so retags stay in place
+FLAC_MAX_BLOCK_SIZE = (1 << 24) - 1  # FLAC metadata block length limit
+TAG_SHM_THRESHOLD = 64 * 1024  # Covers at least this large reach tag workers via shared memory
+FLAC_PROBE_BYTES = 42  # "fLaC" + STREAMINFO: enough to read a stream's sample rate and bit depth
+
+# Library index
+SCAN_WORKERS = 8  # Threads reading tags during `sexify scan`
+SCAN_BATCH_SIZE = 500  # Index rows written per transaction
+
+# Job journal
+JOURNAL_STREAM_TTL = 10 * 60  # Reuse a stream resolved by an interrupted run this long (signed URLs expire)
+
+# Daemon (`sexify serve`)
+SERVE_HOST = "127.0.0.1"  # Local only: the API has no authentication
+SERVE_PORT = 8765
+SERVE_MAX_BODY = 1024 * 1024  # Largest accepted job submission, in bytes
 
 # Download settings
 DOWNLOAD_CHUNK_SIZE = 8192  # 8KB chunks for memory efficiency
@@ -17,6 +65,20 @@ DOWNLOAD_CHUNK_SIZE = 8192  # 8KB chunks for memory efficiency
 AMAZON_MAX_POLL_ATTEMPTS = 60  # Maximum number of status checks
 AMAZON_POLL_INTERVAL = 3  # Seconds between status checks
 AMAZON_TOTAL_TIMEOUT = AMAZON_MAX_POLL_ATTEMPTS * AMAZON_POLL_INTERVAL  # 180 seconds
+AMAZON_PREPARED_FILES = 256  # Prepared file URLs remembered for region fallback on fetch
+
+# Qobuz download-URL providers
+QOBUZ_HEDGE_DELAY = 1.5  # Seconds before racing the next provider
+QOBUZ_PROVIDER_LATENCY_PRIOR = 3.0  # Assumed latency for providers without stats
+
+# Service scoreboard (adaptive fallback ordering)
+SCOREBOARD_WINDOW = 20  # Recent attempts considered per service
+SCOREBOARD_MAX_AGE = 24 * 3600  # Ignore attempts older than a day
+SCOREBOARD_PRIOR_SECONDS = 20  # Assumed attempt time for services without history
+SCOREBOARD_PREFERRED_BONUS = 1.5  # Another service must be this much faster to jump ahead
+
+# Speculative multi-service resolution
+SPECULATIVE_GRACE_PERIOD = 2.0  # Seconds to wait for a better-quality candidate
 
 # SongLink API rate limiting
 SONGLINK_MAX_CALLS_PER_MINUTE = 9
@@ -27,3 +89,9 @@ SONGLINK_API_TIMEOUT = 30  # seconds for API requests
 # Retry settings
 MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 2
+RETRY_BASE_DELAY = 0.5  # Seconds before the first retry (jittered)
+RETRY_MAX_DELAY = 30  # Longer waits (e.g. Retry-After) are not retried
+RETRY_BUDGET = 200  # Total retries allowed per run
+
+# ISRC -> service track ID index
+INDEX_NEGATIVE_TTL = 7 * 24 * 3600  # Re-check "not available" entries after a week
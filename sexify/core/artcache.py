@@ -0,0 +1,125 @@
+import hashlib
+import os
+import time
+from typing import Optional
+from .store import SQLiteStore
+from ..core.config import config
+from ..utils.logger import log_debug
+from ..constants import ARTWORK_NEGATIVE_TTL, APPLE_BASE_TTL
+
+class ArtworkCache(SQLiteStore):
+    """
+    Persistent, size-capped artwork cache (~/.sexify/artwork.db plus
+    ~/.sexify/artwork/). URLs map to a SHA-256 of the image bytes, which are
+    stored once per hash, so albums seen via several URLs share one file.
+    Missing sizes and Apple page -> artwork base URL lookups are kept too.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artwork_urls (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS artwork_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS apple_bases (
+            page_url TEXT PRIMARY KEY,
+            base_url TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None, blob_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None):
+        super().__init__("artwork.db", path)
+        self.blob_dir = blob_dir or str(config.config_dir / "artwork")
+        if max_bytes is None:
+            max_bytes = int(config.get("artwork_cache_mb", 512)) * 1024 * 1024
+        self.max_bytes = max_bytes
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Cached bytes for a URL, b"" if it is known to be missing, None if unknown."""
+        rows = self.execute("SELECT sha256, fetched_at FROM artwork_urls WHERE url = ?", (url,))
+        if not rows:
+            return None
+        sha256, fetched_at = rows[0]
+        if not sha256:
+            return b"" if time.time() - fetched_at < ARTWORK_NEGATIVE_TTL else None
+        try:
+            with open(self._blob_path(sha256), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.execute("DELETE FROM artwork_urls WHERE sha256 = ?", (sha256,))
+            self.execute("DELETE FROM artwork_blobs WHERE sha256 = ?", (sha256,))
+            return None
+        self.execute("UPDATE artwork_blobs SET last_used = ? WHERE sha256 = ?", (time.time(), sha256))
+        return data
+
+    def put(self, url: str, data: bytes):
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+        except OSError as e:
+            log_debug(f"Artwork cache write failed: {e}", 'cover')
+            return
+        now = time.time()
+        self.execute(
+            "INSERT OR REPLACE INTO artwork_blobs (sha256, size, last_used) VALUES (?, ?, ?)",
+            (sha256, len(data), now)
+        )
+        self.execute(
+            "INSERT OR REPLACE INTO artwork_urls (url, sha256, fetched_at) VALUES (?, ?, ?)",
+            (url, sha256, now)
+        )
+        self._evict()
+
+    def put_missing(self, url: str):
+        """Remember that a URL has no artwork (e.g. a size Apple does not offer)."""
+        self.execute(
+            "INSERT OR REPLACE INTO artwork_urls (url, sha256, fetched_at) VALUES (?, '', ?)",
+            (url, time.time())
+        )
+
+    def get_apple_base(self, page_url: str) -> Optional[str]:
+        rows = self.execute(
+            "SELECT base_url, fetched_at FROM apple_bases WHERE page_url = ?", (page_url,)
+        )
+        if rows and time.time() - rows[0][1] < APPLE_BASE_TTL:
+            return rows[0][0]
+        return None
+
+    def put_apple_base(self, page_url: str, base_url: str):
+        self.execute(
+            "INSERT OR REPLACE INTO apple_bases (page_url, base_url, fetched_at) VALUES (?, ?, ?)",
+            (page_url, base_url, time.time())
+        )
+
+    def _evict(self):
+        """Drop least recently used blobs until the cache fits in max_bytes."""
+        total = self.execute("SELECT COALESCE(SUM(size), 0) FROM artwork_blobs")[0][0]
+        if total <= self.max_bytes:
+            return
+        for sha256, size in self.execute("SELECT sha256, size FROM artwork_blobs ORDER BY last_used"):
+            try:
+                os.remove(self._blob_path(sha256))
+            except OSError:
+                pass
+            self.execute("DELETE FROM artwork_urls WHERE sha256 = ?", (sha256,))
+            self.execute("DELETE FROM artwork_blobs WHERE sha256 = ?", (sha256,))
+            total -= size
+            if total <= self.max_bytes:
+                break
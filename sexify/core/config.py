@@ -11,6 +11,8 @@ DEFAULT_CONFIG = {
     "filename_template": "{track}. {title} - {artist}",
     "include_track_numbers": True,
     "service": "tidal",
+    "adaptive_fallback": False,
+    "speculative_resolve": False,
     "tidal": {
         "quality": "HI_RES_LOSSLESS",
         "token": ""
@@ -18,7 +20,8 @@ DEFAULT_CONFIG = {
     "qobuz": {
         "quality": "27",
         "token": "",
-        "app_id": ""
+        "app_id": "",
+        "race_providers": False
     },
     "amazon": {
         "region": "US"
@@ -30,10 +33,25 @@ DEFAULT_CONFIG = {
     "save_cover_art": True,
     "cover_filename": "cover.png",
     "embed_max_quality_cover": True,
+    "artwork_cache_mb": 512,
+    "derive_tag_cover": False,
     "embed_lyrics": True,
+    "single_pass_tagging": True,
+    "tag_workers": 2,
     "skip_existing": True,
+    "skip_existing_anywhere": False,
     "show_progress": True,
-    "concurrent_downloads": 5
+    "concurrent_downloads": 5,
+    "network": {
+        "per_host_connections": 4,
+        "max_bandwidth": 0,
+        "adaptive_timeouts": True
+    },
+    "service_concurrency": {
+        "tidal": 2,
+        "qobuz": 2,
+        "amazon": 2
+    }
 }
 
 class ConfigManager:
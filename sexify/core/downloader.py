@@ -3,20 +3,53 @@ import time
 import uuid
 import shutil
 import atexit
+import threading
+from contextlib import nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
 from ..services.spotify import SpotifyClient
+from ..services.songlink import SongLinkClient
 from ..services.amazon import AmazonDownloader
 from ..services.tidal import TidalDownloader
 from ..services.qobuz import QobuzDownloader
 from ..services.lyrics import LyricsClient
 from ..services.cover import CoverClient
-from ..utils.metadata import embed_metadata, embed_lyrics, extract_isrc
+from ..utils.metadata import embed_lyrics, extract_isrc, read_track_info
 from ..utils.filename import build_expected_filename, sanitize_filename, build_folder_path
 from ..utils.progress import ProgressManager
 from ..utils.filemanager import check_file_exists, ensure_dir
-from ..utils.logger import log_info, log_error, log_success, log_warn, log_sub
+from ..utils.logger import log_info, log_error, log_success, log_warn, log_sub, log_debug
 from ..core.config import config
+from ..core.trackindex import TrackIndex, NOT_AVAILABLE
+from ..core.scoreboard import ServiceScoreboard
+from ..core.lyricscache import lyrics_key
+from ..core.tagging import TagPool
+from ..core.library import LibraryIndex, quality_tier
+from ..core.journal import JobJournal, RESOLVED, DOWNLOADED, TAGGED, FAILED
+from ..constants import SPECULATIVE_GRACE_PERIOD, LYRICS_PREFETCH_WORKERS
+
+# Delivered quality tier per service quality setting (3 = hi-res, 2 = CD, 1 = lossy)
+QUALITY_RANK = {
+    "HI_RES_LOSSLESS": 3, "LOSSLESS": 2, "HIGH": 1, "NORMAL": 1, "LOW": 1,  # Tidal
+    "27": 3, "7": 3, "6": 2, "5": 1,  # Qobuz
+    "AUTO": 3,  # Amazon setting (best available, up to Ultra HD)
+    "UHD": 3, "HD": 2, "SD": 1,  # Amazon, as probed from the prepared file
+}
+
+# Lossless quality setting per service for each tier. Lossy tiers differ in
+# codec (AAC vs MP3) and have no cross-service equivalent.
+SERVICE_QUALITY = {
+    "tidal": {3: "HI_RES_LOSSLESS", 2: "LOSSLESS"},
+    "qobuz": {3: "27", 2: "6"},
+    "amazon": {3: "AUTO", 2: "AUTO"},
+}
+
+def equivalent_quality(quality: str, from_service: str, to_service: str) -> Optional[str]:
+    """Translate a service-specific quality setting to another service, if it has an equivalent."""
+    if from_service == to_service:
+        return quality
+    return SERVICE_QUALITY.get(to_service, {}).get(QUALITY_RANK.get(quality, 0))
 
 @dataclass
 class DownloadRequest:
@@ -37,28 +70,56 @@ class DownloadRequest:
     total_tracks: int = 0
     disc_number: int = 1
     position: int = 0
+    duration_ms: int = 0
     embed_lyrics: bool = True
     embed_max_quality_cover: bool = True
+    speculative: bool = False
+    route: str = ""  # Service to try first (load balancing); naming still follows `service`
+    journal_id: int = 0  # Row in the job journal, 0 if not journaled
     
     is_playlist: bool = False
     playlist_name: str = "" 
     
     description: str = ""
 
+def completed(ok: bool) -> "Future[bool]":
+    """An already resolved track outcome."""
+    future: "Future[bool]" = Future()
+    future.set_result(ok)
+    return future
+
 class Downloader:
     def __init__(self):
         self.spotify = SpotifyClient()
-        self.amazon = AmazonDownloader()
+        self.songlink = SongLinkClient()
+        self.amazon = AmazonDownloader(songlink=self.songlink)
         self.tidal = TidalDownloader()
         self.qobuz = QobuzDownloader()
         self.lyrics = LyricsClient()
         self.cover = CoverClient()
+        self.index = TrackIndex()
+        self.scoreboard = ServiceScoreboard()
+        self.library = LibraryIndex()
+        self.journal: Optional[JobJournal] = None  # Set by callers that journal their runs
+        # Set by LoadBalancer: holds one of a service's slots for the duration of an attempt on it
+        self.service_slots: Optional[Callable[[str], ContextManager]] = None
+        self.skip_existing = config.get("skip_existing", True)
+        # Off: only files under a request's output directory count as already downloaded
+        self.skip_existing_anywhere = config.get("skip_existing_anywhere", False)
+        self.adaptive_fallback = config.get("adaptive_fallback", False)
+        self.derive_tag_cover = config.get("derive_tag_cover", False)
+        self.single_pass_tagging = config.get("single_pass_tagging", True)
+        self.tagger = TagPool(config.get("tag_workers", 2))
+        self._lyrics_pool = ThreadPoolExecutor(max_workers=LYRICS_PREFETCH_WORKERS, thread_name_prefix="lyrics-prefetch")
+        self._lyrics_futures: Dict[str, Future] = {}
+        self._lyrics_lock = threading.Lock()
         self.progress = ProgressManager.get_instance()
         
         self.session_id = str(uuid.uuid4())[:8]
         self._temp_dir = None
         
         atexit.register(self._cleanup_temp)
+        atexit.register(self.drain_tagging)  # Runs first: queued tag writes still need the temp files
     
     def _get_temp_dir(self, base_dir: str) -> str:
         if self._temp_dir is None:
@@ -74,7 +135,67 @@ class Downloader:
             except Exception:
                 pass
 
-    def download_track(self, req: DownloadRequest) -> bool:
+    def wait_for_tagging(self):
+        """Wait for the tag writes queued so far; the tag workers stay up for later jobs."""
+        self.tagger.wait()
+
+    def drain_tagging(self):
+        """Wait for all queued tag writes to finish and shut the tag workers down."""
+        self.tagger.drain()
+
+    def _journal(self, req: DownloadRequest, state: str, **resolved):
+        if self.journal is not None and req.journal_id:
+            self.journal.mark(req.journal_id, state, **resolved)
+
+    def prefetch_lyrics(self, req: DownloadRequest):
+        """Start fetching lyrics in the background so tagging does not wait on them."""
+        if not req.embed_lyrics:
+            return
+        key = lyrics_key(req.artist_name, req.track_name, req.duration_ms)
+        with self._lyrics_lock:
+            if key not in self._lyrics_futures:
+                self._lyrics_futures[key] = self._lyrics_pool.submit(
+                    self.lyrics.fetch_lyrics, req.track_name, req.artist_name, req.duration_ms
+                )
+
+    def _drop_lyrics(self, req: DownloadRequest):
+        """Forget a request's lyrics prefetch, cancelling it if it has not started."""
+        with self._lyrics_lock:
+            future = self._lyrics_futures.pop(lyrics_key(req.artist_name, req.track_name, req.duration_ms), None)
+        if future is not None:
+            future.cancel()
+
+    def _take_lyrics(self, req: DownloadRequest) -> Optional[str]:
+        """Lyrics for a request, awaiting its prefetch if one was started."""
+        key = lyrics_key(req.artist_name, req.track_name, req.duration_ms)
+        with self._lyrics_lock:
+            future = self._lyrics_futures.pop(key, None)
+        if future is None:
+            return self.lyrics.fetch_lyrics(req.track_name, req.artist_name, req.duration_ms)
+        try:
+            return future.result()
+        except Exception as e:
+            log_debug(f"Lyrics prefetch failed: {e}", 'sexify')
+            return None
+
+    def find_in_library(self, req: DownloadRequest) -> Optional[Dict]:
+        """Indexed file for the request's ISRC; lossy files do not satisfy lossless requests."""
+        if not self.skip_existing:
+            return None
+        return self.library.find(req.isrc, min(QUALITY_RANK.get(req.audio_format, 0), 2),
+                                 self._library_scope(req))
+
+    def _library_scope(self, req: DownloadRequest) -> str:
+        """Directory an indexed copy must be under to satisfy a request ("" = anywhere)."""
+        return "" if self.skip_existing_anywhere else req.output_dir
+
+    def _index_file(self, path: str):
+        info = read_track_info(path)
+        if info:
+            self.library.add(path, info)
+
+    def build_output_path(self, req: DownloadRequest) -> Tuple[str, str]:
+        """(output directory, file name) a request will be saved as."""
         if req.is_playlist and req.playlist_name:
             from ..utils.filename import sanitize_filename
             safe_playlist_name = sanitize_filename(req.playlist_name)
@@ -94,8 +215,6 @@ class Downloader:
             else:
                 final_output_dir = req.output_dir
             
-        ensure_dir(final_output_dir)
-        
         # Determine file extension based on quality
         extension = self._get_extension_for_quality(req.audio_format, req.service)
         
@@ -109,13 +228,76 @@ class Downloader:
         if not expected_filename.endswith(f".{extension}"):
             expected_filename += f".{extension}"
             
+        return final_output_dir, expected_filename
+
+    def preflight(self, requests: List[DownloadRequest]) -> Tuple[List[DownloadRequest], int]:
+        """
+        Drop requests whose track is already on disk, checking the whole batch
+        against the library index at once: by ISRC, then by expected path.
+        Returns (requests still to download, number already present).
+        """
+        if not self.skip_existing or not requests:
+            return requests, 0
+
+        by_isrc: Dict[Tuple[str, str], Dict] = {}
+        for scope in {self._library_scope(req) for req in requests}:
+            found = self.library.find_many([req.isrc for req in requests if self._library_scope(req) == scope],
+                                           scope)
+            by_isrc.update(((scope, isrc), entry) for isrc, entry in found.items())
+        targets = {id(req): os.path.join(*self.build_output_path(req)) for req in requests}
+        by_path = self.library.lookup_paths(targets.values())
+
+        pending = []
+        for req in requests:
+            entry = by_isrc.get((self._library_scope(req), req.isrc.upper()))
+            if entry and entry["quality"] >= min(QUALITY_RANK.get(req.audio_format, 0), 2):
+                self._journal(req, TAGGED)
+                continue
+            path = targets[id(req)]
+            entry = by_path.get(os.path.abspath(path))
+            if entry is None and check_file_exists(path):
+                # On disk but not indexed yet
+                info = read_track_info(path)
+                if info:
+                    self.library.add(path, info)
+                    entry = info
+            if entry and req.isrc and (entry.get("isrc") or "").upper() == req.isrc.upper():
+                self._journal(req, TAGGED)
+                continue
+            pending.append(req)
+        return pending, len(requests) - len(pending)
+
+    def download_track(self, req: DownloadRequest) -> "Future[bool]":
+        """
+        Download and tag one track. Returns a future resolving to whether the
+        track ended up on disk and tagged: tagging runs in the tag pool, so
+        the future of a downloaded track completes when its tag write does.
+        """
+        try:
+            return self._download_track(req)
+        finally:
+            # Skipped, failed or crashed: an unused prefetch must not linger
+            self._drop_lyrics(req)
+
+    def _download_track(self, req: DownloadRequest) -> "Future[bool]":
+        existing = self.find_in_library(req)
+        if existing:
+            log_warn(f"Skipping (in library): {os.path.basename(existing['path'])}", 'sexify')
+            self._journal(req, TAGGED)
+            return completed(True)
+
+        self.prefetch_lyrics(req)
+        final_output_dir, expected_filename = self.build_output_path(req)
+        ensure_dir(final_output_dir)
         output_path = os.path.join(final_output_dir, expected_filename)
         
         if check_file_exists(output_path):
             existing_isrc = extract_isrc(output_path)
             if existing_isrc and existing_isrc == req.isrc:
                  log_warn(f"Skipping (exists): {expected_filename}", 'sexify')
-                 return True
+                 self._index_file(output_path)
+                 self._journal(req, TAGGED)
+                 return completed(True)
 
         temp_dir = self._get_temp_dir(req.output_dir)
         temp_filename = f"{req.service}_{int(time.time())}_{expected_filename}"
@@ -130,37 +312,66 @@ class Downloader:
             "qobuz": ["tidal", "amazon"]
         }
         
-        services_to_try = [req.service] + fallback_order.get(req.service, [])
+        first_service = req.route or req.service
+        services_to_try = [first_service] + [s for s in fallback_order.get(first_service, []) if s != req.service]
+        if first_service != req.service:
+            services_to_try.insert(1, req.service)
+        if self.adaptive_fallback:
+            services_to_try = self.scoreboard.order(first_service, services_to_try)
+            if services_to_try[0] != first_service:
+                log_info(f"Service order: {' → '.join(s.upper() for s in services_to_try)}", 'sexify')
         
-        for service in services_to_try:
-            if service == "tidal":
-                success = self._download_tidal(req, temp_path)
-            elif service == "amazon":
-                success = self._download_amazon(req, temp_path)
-            elif service == "qobuz":
-                success = self._download_qobuz(req, temp_path)
-            
-            if success and check_file_exists(temp_path):
-                used_service = service
-                break
-            elif service != services_to_try[-1]:
-                log_warn(f"Trying fallback: {services_to_try[services_to_try.index(service)+1].upper()}", 'sexify')
+        if req.speculative:
+            used_service = self._download_speculative(req, services_to_try, temp_path)
+            success = used_service is not None
+        else:
+            for service in services_to_try:
+                success = self._download_from(service, req, temp_path)
+                
+                if success and check_file_exists(temp_path):
+                    used_service = service
+                    break
+                elif service != services_to_try[-1]:
+                    log_warn(f"Trying fallback: {services_to_try[services_to_try.index(service)+1].upper()}", 'sexify')
         
         if success and check_file_exists(temp_path):
-            shutil.move(temp_path, output_path)
-            
-            self._apply_metadata(output_path, req, final_output_dir)
+            self._journal(req, DOWNLOADED)
+            meta, tag_cover_data = self._build_metadata(req, final_output_dir)
+            if self.single_pass_tagging and output_path.endswith(".flac"):
+                tagged = self.tagger.submit(temp_path, output_path, meta, tag_cover_data)
+            else:
+                shutil.move(temp_path, output_path)
+                tagged = self.tagger.submit(None, output_path, meta, tag_cover_data)
+
+            outcome: "Future[bool]" = Future()
+
+            def index_when_tagged(future: Future):
+                ok = future.exception() is None and bool(future.result())
+                try:
+                    if ok:
+                        self._index_file(output_path)
+                        self._journal(req, TAGGED)
+                    else:
+                        self._journal(req, FAILED)
+                except Exception as e:
+                    # e.g. a locked database: the file is tagged, only the bookkeeping is missing
+                    log_error(f"Could not record {expected_filename}: {e}", 'sexify')
+                finally:
+                    outcome.set_result(ok)
+
+            tagged.add_done_callback(index_when_tagged)
             
-            log_success(f"Completed: {expected_filename}", 'sexify')
+            log_success(f"Downloaded: {expected_filename} (tagging queued)", 'sexify')
             print()  # Empty line after each track for cleaner logs
-            return True
+            return outcome
 
             
         if check_file_exists(temp_path):
             os.remove(temp_path)
             
         log_error(f"- Failed to download: {req.track_name} (all services tried)", 'sexify')
-        return False
+        self._journal(req, FAILED)
+        return completed(False)
 
     def _get_extension_for_quality(self, quality: str, service: str) -> str:
         """Get the appropriate file extension based on quality and service."""
@@ -178,21 +389,181 @@ class Downloader:
         # Other services (amazon) default to flac
         return "flac"
     
-    def _download_tidal(self, req: DownloadRequest, output_path: str) -> bool:
+    def _download_from(self, service: str, req: DownloadRequest, output_path: str) -> bool:
+        """Resolve and download from one service, recording the attempt on the scoreboard."""
+        with self.service_slots(service) if self.service_slots else nullcontext():
+            return self._attempt(service, req, output_path)
+
+    def _attempt(self, service: str, req: DownloadRequest, output_path: str) -> bool:
+        start = time.monotonic()
+        resolved = self._resolve_stream(service, req)
+        ready = time.monotonic()
+        
+        success = bool(resolved) and self._fetch_stream(service, resolved[0], output_path)
+        if not success and resolved and self._journaled_stream(service, req) == resolved:
+            # The stream resolved by an interrupted run may have expired: resolve afresh once
+            log_sub("Journaled stream failed, resolving again", service)
+            resolved = self._resolve_stream(service, req, fresh=True)
+            ready = time.monotonic()
+            success = bool(resolved) and self._fetch_stream(service, resolved[0], output_path)
+        nbytes = os.path.getsize(output_path) if success and check_file_exists(output_path) else 0
+        if resolved or not self._not_on_service(service, req):
+            self.scoreboard.record(service, nbytes > 0, ready - start, nbytes, time.monotonic() - ready)
+        return success
+
+    def _not_on_service(self, service: str, req: DownloadRequest) -> bool:
+        """
+        Whether the service is known not to carry the track. Such misses say
+        nothing about the service's health and are kept off the scoreboard.
+        """
+        return bool(req.isrc) and self.index.get(req.isrc, service) == NOT_AVAILABLE
+
+    def _download_speculative(self, req: DownloadRequest, services: List[str],
+                              output_path: str) -> Optional[str]:
+        """
+        Resolve all services concurrently and download from the best ready one.
+        Starts as soon as a candidate delivers the requested quality; otherwise
+        waits SPECULATIVE_GRACE_PERIOD after the first candidate for a better one.
+        Remaining resolvers are cancelled; if every ready candidate fails to
+        transfer, the cancelled services are tried serially like the regular
+        fallback chain. Returns the service used, or None.
+        """
+        target_rank = QUALITY_RANK.get(req.audio_format, 2)
+        cancel = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=len(services))
+        start = time.monotonic()
+        futures = {pool.submit(self._resolve_stream, service, req, cancel): service for service in services}
+        ready: Dict[str, Tuple[str, str]] = {}
+        ready_at: Dict[str, float] = {}
+        pending = set(futures)
+        deadline = None
+        
+        def ranked() -> List[str]:
+            return sorted(ready, key=lambda s: (-QUALITY_RANK.get(ready[s][1], 0), services.index(s)))
+        
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    service = futures[future]
+                    try:
+                        resolved = future.result()
+                    except Exception as e:
+                        log_error(f"Resolver failed: {e}", service)
+                        resolved = None
+                    if resolved:
+                        ready[service] = resolved
+                        ready_at[service] = time.monotonic()
+                    elif not self._not_on_service(service, req):
+                        self.scoreboard.record(service, False, time.monotonic() - start)
+                
+                if ready:
+                    if QUALITY_RANK.get(ready[ranked()[0]][1], 0) >= target_rank:
+                        break
+                    if deadline is None:
+                        deadline = time.monotonic() + SPECULATIVE_GRACE_PERIOD
+                    elif time.monotonic() >= deadline:
+                        break
+        finally:
+            cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        cancelled = [service for service in services if any(futures[f] == service for f in pending)]
+        if cancelled:
+            log_sub(f"Cancelled: {', '.join(s.upper() for s in cancelled)}", 'sexify')
+        
+        for service in ranked():
+            stream_url, quality = ready[service]
+            log_info(f"Using {service.upper()} ({quality})", 'sexify')
+            self._journal(req, RESOLVED, service=service, stream_url=stream_url, quality=quality)
+            fetch_start = time.monotonic()
+            success = self._fetch_stream(service, stream_url, output_path)
+            nbytes = os.path.getsize(output_path) if success and check_file_exists(output_path) else 0
+            self.scoreboard.record(service, nbytes > 0, ready_at[service] - start, nbytes,
+                                   time.monotonic() - fetch_start)
+            if nbytes > 0:
+                return service
+
+        for service in cancelled:
+            log_warn(f"Trying fallback: {service.upper()}", 'sexify')
+            if self._download_from(service, req, output_path) and check_file_exists(output_path):
+                return service
+        return None
+
+    def _resolve_stream(self, service: str, req: DownloadRequest,
+                        cancel: Optional[threading.Event] = None,
+                        fresh: bool = False) -> Optional[Tuple[str, str]]:
+        """
+        Resolve a downloadable stream on one service. Returns (stream_url, quality).
+        A stream journaled by an interrupted run is reused while still fresh.
+        """
+        if not fresh:
+            journaled = self._journaled_stream(service, req)
+            if journaled:
+                log_sub(f"+ Stream resolved earlier ({journaled[1]}), reusing", service)
+                return journaled
+
+        quality = self._quality_for(service, req)
+        resolved = None
+        if service == "tidal":
+            resolved = self._resolve_tidal(req, quality, cancel)
+        elif service == "amazon":
+            resolved = self._resolve_amazon(req, cancel)
+        elif service == "qobuz":
+            resolved = self._resolve_qobuz(req, quality)
+        if resolved and not (cancel is not None and cancel.is_set()):
+            # A speculative resolver that lost the race must not overwrite the winner's stream
+            self._journal(req, RESOLVED, service=service, stream_url=resolved[0], quality=resolved[1])
+        return resolved
+
+    def _journaled_stream(self, service: str, req: DownloadRequest) -> Optional[Tuple[str, str]]:
+        if self.journal is None or not req.journal_id:
+            return None
+        return self.journal.resolved_stream(req.journal_id, service)
+
+    def _quality_for(self, service: str, req: DownloadRequest) -> str:
+        """Quality setting to request from a service: the requested one or its equivalent."""
+        quality = equivalent_quality(req.audio_format, req.service, service)
+        if quality:
+            return quality
+        if service == "tidal":
+            return req.audio_format
+        return config.get(f"{service}.quality") or ""
+
+    def _fetch_stream(self, service: str, stream_url: str, output_path: str) -> bool:
+        if service == "tidal":
+            log_sub("Downloading...", 'tidal')
+            return self.tidal.download(stream_url, output_path)
+        elif service == "amazon":
+            return self.amazon.fetch(stream_url, output_path)
+        elif service == "qobuz":
+            return self.qobuz.download(stream_url, output_path)
+        return False
+
+    def _resolve_tidal_id(self, req: DownloadRequest) -> Optional[int]:
+        cached = self.index.get(req.isrc, "tidal")
+        if cached == NOT_AVAILABLE:
+            log_warn("Not available on Tidal (cached)", 'tidal')
+            return None
+        if cached:
+            log_sub(f"+ Track ID: {cached} (cached)", 'tidal')
+            return int(cached)
+        
         if not req.spotify_id:
             log_error("No Spotify ID for TIDAL lookup", 'tidal')
-            return False
+            return None
         
         # Use SongLink to get Tidal URL (like V4 does)
-        from ..services.songlink import SongLinkClient
-        songlink = SongLinkClient()
-        
         log_info("Obtaining Tidal URL via SongLink", 'tidal')
-        tidal_url = songlink.get_tidal_url(req.spotify_id)
+        links = self.songlink.lookup(req.spotify_id)
+        tidal_url = links.get("tidal") if links else None
         
         if not tidal_url:
+            if links is not None:
+                self.index.put(req.isrc, "tidal", NOT_AVAILABLE)
             log_error("Tidal URL not found via SongLink", 'tidal')
-            return False
+            return None
         
         log_sub(f"+ {tidal_url}", 'tidal')
         
@@ -201,10 +572,18 @@ class Downloader:
         match = re.search(r'/track/(\d+)', tidal_url)
         if not match:
             log_error(f"Could not extract track ID from: {tidal_url}", 'tidal')
-            return False
+            return None
         
         track_id = int(match.group(1))
         log_sub(f"+ Track ID: {track_id}", 'tidal')
+        self.index.put(req.isrc, "tidal", str(track_id))
+        return track_id
+
+    def _resolve_tidal(self, req: DownloadRequest, requested_quality: str,
+                       cancel: Optional[threading.Event] = None) -> Optional[Tuple[str, str]]:
+        track_id = self._resolve_tidal_id(req)
+        if not track_id:
+            return None
         
         log_sub("Getting stream URL...", 'tidal')
         
@@ -213,58 +592,134 @@ class Downloader:
         quality_hierarchy = ["HI_RES_LOSSLESS", "LOSSLESS", "HIGH", "NORMAL", "LOW"]
         
         try:
-            start_idx = quality_hierarchy.index(req.audio_format)
+            start_idx = quality_hierarchy.index(requested_quality)
             quality_chain = quality_hierarchy[start_idx:]
         except ValueError:
             # Unknown quality, default to lossless chain
-            quality_chain = [req.audio_format, "LOSSLESS", "HIGH"]
+            quality_chain = [requested_quality, "LOSSLESS", "HIGH"]
         
         stream_url = None
         for quality in quality_chain:
+            if cancel is not None and cancel.is_set():
+                return None
             stream_url = self.tidal.get_stream_url(track_id, quality)
             if stream_url:
-                if quality != req.audio_format:
+                if quality != requested_quality:
                     log_warn(f"Quality fallback: {quality}", 'tidal')
                 break
         
         if not stream_url:
             log_error("Could not get stream URL from Tidal APIs", 'tidal')
-            return False
+            return None
         
-        log_sub("Downloading...", 'tidal')
-        return self.tidal.download(stream_url, output_path)
+        return stream_url, quality
 
-    def _download_amazon(self, req: DownloadRequest, output_path: str) -> bool:
+    def _resolve_amazon_url(self, req: DownloadRequest) -> Optional[str]:
+        cached = self.index.get(req.isrc, "amazon")
+        if cached == NOT_AVAILABLE:
+            log_warn("Not available on Amazon (cached)", 'amazon')
+            return None
+        if cached:
+            log_sub(f"+ ASIN: {cached} (cached)", 'amazon')
+            return self.amazon.track_url(cached)
+        
         if not req.spotify_id:
-            return False
+            return None
+        
+        log_info("Obtaining Amazon URL via SongLink", 'amazon')
+        links = self.songlink.lookup(req.spotify_id)
+        if links is None:
+            log_error("- Song.link lookup failed", 'amazon')
+            return None
         
-        url = self.amazon.get_amazon_url(req.spotify_id)
+        url = self.amazon.get_amazon_url(req.spotify_id, links=links)
         if url:
-             return self.amazon.download(url, output_path)
-        return False
+            self.index.put(req.isrc, "amazon", self.amazon.extract_asin(links["amazon"]) or url)
+        else:
+            self.index.put(req.isrc, "amazon", NOT_AVAILABLE)
+        return url
+
+    def _resolve_amazon(self, req: DownloadRequest,
+                        cancel: Optional[threading.Event] = None) -> Optional[Tuple[str, str]]:
+        url = self._resolve_amazon_url(req)
+        if url:
+            file_url = self.amazon.request_file(url, cancel)
+            if file_url:
+                return file_url, self._amazon_quality(file_url)
+        return None
+
+    def _amazon_quality(self, file_url: str) -> str:
+        """Delivered quality of a prepared Amazon file; CD quality if it cannot be probed."""
+        stream_info = self.amazon.probe_format(file_url)
+        if stream_info is None:
+            return "HD"
+        quality = {3: "UHD", 2: "HD"}.get(quality_tier("flac", *stream_info), "SD")
+        log_sub(f"+ {quality} ({stream_info[1]}-bit/{stream_info[0] / 1000:g}kHz)", 'amazon')
+        return quality
+
+    def _resolve_qobuz_id(self, req: DownloadRequest) -> Optional[int]:
+        cached = self.index.get(req.isrc, "qobuz")
+        if cached == NOT_AVAILABLE:
+            log_warn("Not available on Qobuz (cached)", 'qobuz')
+            return None
+        if cached:
+            log_sub(f"+ Track ID: {cached} (cached)", 'qobuz')
+            return int(cached)
+        
+        track = self.qobuz.resolve_isrc(req.isrc)
+        if track:
+            self.index.put(req.isrc, "qobuz", str(track['id']))
+            return track['id']
+        if self.qobuz.is_unavailable(req.isrc):
+            self.index.put(req.isrc, "qobuz", NOT_AVAILABLE)
+        return None
 
-    def _download_qobuz(self, req: DownloadRequest, output_path: str) -> bool:
+    def _resolve_qobuz(self, req: DownloadRequest, quality: str) -> Optional[Tuple[str, str]]:
         if not req.isrc:
-            return False
+            return None
             
-        track = self.qobuz.search_isrc(req.isrc)
-        if track:
-             url = self.qobuz.get_download_url(track['id'])
-             if url:
-                 return self.qobuz.download(url, output_path)
-        return False
+        track_id = self._resolve_qobuz_id(req)
+        if track_id:
+            url = self.qobuz.get_download_url(track_id, quality or None)
+            if url:
+                return url, self._qobuz_quality(req, quality or self.qobuz.quality, url)
+        return None
+
+    def _qobuz_quality(self, req: DownloadRequest, requested: str, url: str) -> str:
+        """
+        Delivered quality of a Qobuz stream: the requested setting, capped by
+        the best version of the track (from its listing, else a probe of the
+        URL). CD quality if neither is known.
+        """
+        requested_rank = QUALITY_RANK.get(requested, 0)
+        if requested_rank < 3:
+            return requested  # CD or lossy: the setting is what is delivered
+        stream_info = self.qobuz.track_format(req.isrc) or self.qobuz.probe_format(url)
+        if stream_info is None:
+            return "6"
+        if quality_tier("flac", *stream_info) >= requested_rank:
+            return requested
+        log_sub(f"+ CD quality only ({stream_info[1]}-bit/{stream_info[0] / 1000:g}kHz)", 'qobuz')
+        return "6"
 
-    def _apply_metadata(self, filepath: str, req: DownloadRequest, album_dir: str):
+    def _build_metadata(self, req: DownloadRequest, album_dir: str) -> Tuple[Dict[str, str], Optional[bytes]]:
+        """Tags and tag cover bytes for a track; also saves the album cover."""
         apple_music_url = None
         if req.spotify_id:
-            from ..services.songlink import SongLinkClient
-            songlink = SongLinkClient()
-            links = songlink.get_links(req.spotify_id)
+            links = self.songlink.get_links(req.spotify_id)
             apple_music_url = links.get('apple', '')
         
+        tag_cover_data = None
         if not req.is_playlist:
             album_cover_path = os.path.join(album_dir, 'Album-Cover.png')
-            if req.cover_url:
+            if req.cover_url and req.embed_max_quality_cover and self.derive_tag_cover:
+                tag_cover_data = self.cover.get_album_artwork(
+                    album_cover_path,
+                    spotify_url=req.cover_url,
+                    apple_music_url=apple_music_url,
+                    album_key=f"{req.album_artist}-{req.album_name}"
+                )
+            elif req.cover_url:
                 if not check_file_exists(album_cover_path):
                     self.cover.download_album_cover(
                         album_cover_path,
@@ -272,10 +727,10 @@ class Downloader:
                         apple_music_url=apple_music_url
                     )
         
-        tag_cover_data = None
-        if req.embed_max_quality_cover:
+        if req.embed_max_quality_cover and not tag_cover_data:
             if req.is_playlist:
-                track_key = f"playlist-{req.spotify_id}"
+                # Playlist tracks from the same album share an artwork URL
+                track_key = req.cover_url or f"playlist-{req.spotify_id}"
                 tag_cover_data = self.cover.get_tag_cover_data(
                     spotify_url=req.cover_url,
                     apple_music_url=apple_music_url,
@@ -305,13 +760,13 @@ class Downloader:
         
         if req.embed_lyrics:
             log_sub("Fetching lyrics...", 'sexify')
-            lyrics = self.lyrics.fetch_lyrics(req.track_name, req.artist_name)
+            lyrics = self._take_lyrics(req)
             if lyrics:
                 log_sub("Lyrics found", 'sexify')
                 meta["lyrics"] = lyrics
             else:
                 log_sub("No lyrics found", 'sexify')
-                
-        embed_metadata(filepath, meta, cover_data=tag_cover_data)
+
+        return meta, tag_cover_data
 
 
@@ -0,0 +1,201 @@
+"""
+Shared job plumbing for the CLI commands: Spotify enumeration, building
+DownloadRequests and running them through the downloader.
+"""
+import threading
+from dataclasses import fields
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from .downloader import Downloader, DownloadRequest
+from .scheduler import LoadBalancer
+from .journal import JobJournal
+from .config import config
+from ..services.spotify import SpotifyClient
+from ..utils.logger import log_info, log_error
+from ..constants import LYRICS_PREFETCH_AHEAD
+
+def fetch_items(spotify: SpotifyClient, parsed: Dict[str, str]) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Enumerate the tracks behind a parsed Spotify URL or ISRC.
+    Returns (track items, playlist name); the name is empty unless a playlist.
+    """
+    items = []
+    playlist_name = ""
+
+    if parsed['type'] == 'track':
+        track = spotify.get_track(parsed['id'])
+        if track: items.append(track)
+        else: log_error("Track not found", 'spotify')
+
+    elif parsed['type'] == 'album':
+        log_info("Fetching album tracks...", 'spotify')
+        items = spotify.get_album_tracks(parsed['id'])
+
+    elif parsed['type'] == 'playlist':
+        log_info("Fetching playlist tracks...", 'spotify')
+        playlist_info = spotify.get_playlist(parsed['id'])
+        playlist_name = playlist_info.get('name', 'Playlist') if playlist_info else 'Playlist'
+        log_info(f"Playlist: {playlist_name}", 'spotify')
+        items = spotify.get_playlist_tracks(parsed['id'])
+
+    elif parsed['type'] == 'isrc':
+        log_info(f"Downloading by ISRC: {parsed['id']}", 'sexify')
+        items.append({
+            'id': '',
+            'name': 'Unknown',
+            'artists': [{'name': 'Unknown'}],
+            'album': {'name': '', 'artists': [], 'release_date': '', 'images': [], 'total_tracks': 1},
+            'external_ids': {'isrc': parsed['id']},
+            'track_number': 1,
+            'disc_number': 1
+        })
+
+    if items and parsed['type'] == 'album':
+        album_info = spotify.get_album(parsed['id'])
+        if album_info:
+            log_info(f"Album: {album_info.get('name')} by {', '.join([a['name'] for a in album_info.get('artists', [])])}", 'spotify')
+            for item in items:
+                item['album'] = {
+                    'name': album_info.get('name', ''),
+                    'artists': album_info.get('artists', []),
+                    'release_date': album_info.get('release_date', ''),
+                    'images': album_info.get('images', []),
+                    'total_tracks': album_info.get('total_tracks', 0)
+                }
+                if not item.get('external_ids'):
+                    full_track = spotify.get_track(item.get('id'))
+                    if full_track:
+                        item['external_ids'] = full_track.get('external_ids', {})
+
+    return items, playlist_name
+
+def build_request(item: Dict[str, Any], position: int, options: Dict[str, Any],
+                  playlist_name: str = "") -> DownloadRequest:
+    """
+    DownloadRequest for one Spotify track item. options holds service,
+    quality, output, lyrics, cover_max and speculative.
+    """
+    artists = item.get('artists', [])
+    artist_name = ", ".join([a['name'] for a in artists])
+    album = item.get('album', {})
+
+    return DownloadRequest(
+        isrc=item.get('external_ids', {}).get('isrc', ''),
+        service=options['service'],
+        spotify_id=item.get('id', ''),
+        track_name=item.get('name', ''),
+        artist_name=artist_name,
+        album_name=album.get('name', ''),
+        album_artist=", ".join([a['name'] for a in album.get('artists', [])]),
+        release_date=album.get('release_date', ''),
+        cover_url=album.get('images', [{}])[0].get('url', '') if album.get('images') else '',
+        output_dir=options['output'],
+        audio_format=options['quality'],
+        filename_format=config.get('filename_template', '{title} - {artist}'),
+        track_number=item.get('track_number', 0),
+        total_tracks=album.get('total_tracks', 0),
+        disc_number=item.get('disc_number', 1),
+        position=position,
+        duration_ms=item.get('duration_ms', 0),
+        embed_lyrics=options['lyrics'],
+        embed_max_quality_cover=options['cover_max'],
+        speculative=options.get('speculative', False),
+        is_playlist=bool(playlist_name),
+        playlist_name=playlist_name
+    )
+
+def read_url_file(path: str) -> List[str]:
+    """URLs listed in a file, one per line; blank lines and # comments are skipped."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return [line for line in lines if line]
+
+def dedupe_requests(requests: List[DownloadRequest]) -> Tuple[List[DownloadRequest], int]:
+    """
+    Drop tracks already requested earlier in the batch (same ISRC, or same
+    Spotify ID when there is no ISRC), e.g. a song on both an album and a
+    playlist. The first occurrence wins. Returns (unique requests, duplicates).
+    """
+    seen = set()
+    unique = []
+    for req in requests:
+        key = req.isrc.upper() or req.spotify_id
+        if key and key in seen:
+            continue
+        seen.add(key)
+        unique.append(req)
+    return unique, len(requests) - len(unique)
+
+def enumerate_requests(spotify: SpotifyClient, urls: List[str],
+                       options: Dict[str, Any]) -> Tuple[List[DownloadRequest], int]:
+    """
+    DownloadRequests for every track behind a list of URLs, deduplicated.
+    Invalid URLs are logged and skipped. Returns (requests, duplicates dropped).
+    """
+    requests = []
+    for url in urls:
+        parsed = spotify.parse_url(url)
+        if not parsed:
+            log_error(f"Invalid Spotify URL: {url}", 'sexify')
+            continue
+        items, playlist_name = fetch_items(spotify, parsed)
+        requests += [build_request(item, i + 1, options, playlist_name) for i, item in enumerate(items)]
+    return dedupe_requests(requests)
+
+def journaled_requests(journal: JobJournal, run_id: int) -> List[DownloadRequest]:
+    """Rebuild the DownloadRequests of a journaled run that were not tagged yet."""
+    known = {f.name for f in fields(DownloadRequest)}
+    requests = []
+    for job_id, values in journal.unfinished(run_id):
+        values = {k: v for k, v in values.items() if k in known}
+        values["journal_id"] = job_id
+        requests.append(DownloadRequest(**values))
+    return requests
+
+def run_requests(downloader: Downloader, requests: List[DownloadRequest],
+                 balance: bool = False) -> List["Future[bool]"]:
+    """
+    Download requests sequentially or load balanced. Returns each request's
+    outcome future (see Downloader.download_track), resolved once it is tagged.
+    Lyrics are prefetched for the LYRICS_PREFETCH_AHEAD queued tracks after
+    each one that starts, so LRCLIB is not flooded with the whole batch at once.
+    """
+    total_tracks = len(requests)
+    started = set()
+    started_lock = threading.Lock()
+
+    def log_processing(i, req):
+        log_info(f"Processing: [{i+1}/{total_tracks}] {req.artist_name} - {req.track_name}", 'sexify')
+        with started_lock:
+            # Under the lock: a track cannot start, finish and drop its prefetch in between
+            started.add(i)
+            for j in range(i + 1, min(i + 1 + LYRICS_PREFETCH_AHEAD, total_tracks)):
+                if j not in started:
+                    downloader.prefetch_lyrics(requests[j])
+
+    if balance:
+        balancer = LoadBalancer(downloader, config.get('service_concurrency', {}))
+        log_info(f"Load balancing across: {', '.join(f'{s.upper()} x{n}' for s, n in balancer.limits.items())}", 'sexify')
+        return balancer.run_each(requests, on_start=log_processing)
+
+    outcomes = []
+    for i, req in enumerate(requests):
+        log_processing(i, req)
+        outcomes.append(downloader.download_track(req))
+    return outcomes
+
+def download_all(downloader: Downloader, requests: List[DownloadRequest],
+                 balance: bool = False) -> Tuple[List[bool], int]:
+    """
+    Skip what is already in the library, download the rest and wait for
+    their tags. Returns (success per remaining request, number skipped).
+    """
+    requests, present_count = downloader.preflight(requests)
+    if present_count:
+        log_info(f"Already in library: {present_count}, to download: {len(requests)}", 'sexify')
+    outcomes = run_requests(downloader, requests, balance)
+    downloader.wait_for_tagging()
+    return [outcome.result() for outcome in outcomes], present_count
+
+def resolve_quality(service: str, quality: Optional[str]) -> str:
+    return quality or config.get(f"{service}.quality") or "LOSSLESS"
@@ -0,0 +1,134 @@
+import json
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from .store import SQLiteStore
+from ..constants import JOURNAL_STREAM_TTL
+
+PENDING = "pending"
+RESOLVED = "resolved"
+DOWNLOADED = "downloaded"
+TAGGED = "tagged"
+FAILED = "failed"
+
+class JobJournal(SQLiteStore):
+    """
+    Crash-safe journal of download runs (~/.sexify/journal.db). Every
+    DownloadRequest of a run is recorded with its state (pending, resolved,
+    downloaded, tagged, failed) and the last resolved stream, so an
+    interrupted run can be resumed without re-enumerating or re-resolving.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            options TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            finished_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL,
+            request TEXT NOT NULL,
+            state TEXT NOT NULL,
+            service TEXT NOT NULL DEFAULT '',
+            stream_url TEXT NOT NULL DEFAULT '',
+            quality TEXT NOT NULL DEFAULT '',
+            resolved_at REAL NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs (run_id, state);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__("journal.db", path)
+
+    def start_run(self, source: str, options: Dict[str, Any]) -> int:
+        with self._lock:
+            self.execute(
+                "INSERT INTO runs (source, options, created_at) VALUES (?, ?, ?)",
+                (source, json.dumps(options), time.time())
+            )
+            return self.execute("SELECT last_insert_rowid()")[0][0]
+
+    def finish_run(self, run_id: int):
+        self.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def run(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """A run's source, options, created_at and finished_at (None while unfinished)."""
+        rows = self.execute(
+            "SELECT source, options, created_at, finished_at FROM runs WHERE run_id = ?", (run_id,)
+        )
+        if not rows:
+            return None
+        source, options, created_at, finished_at = rows[0]
+        return dict(source=source, options=json.loads(options), created_at=created_at, finished_at=finished_at)
+
+    def last_unfinished(self, source: Optional[str] = None) -> Optional[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Most recent run that did not finish, optionally for one source:
+        (run_id, source, options). Runs that never recorded a track are skipped.
+        """
+        recorded = "EXISTS (SELECT 1 FROM jobs WHERE jobs.run_id = runs.run_id)"
+        if source:
+            rows = self.execute(
+                f"SELECT run_id, source, options FROM runs WHERE finished_at IS NULL AND {recorded} "
+                "AND source = ? ORDER BY run_id DESC LIMIT 1", (source,)
+            )
+        else:
+            rows = self.execute(
+                f"SELECT run_id, source, options FROM runs WHERE finished_at IS NULL AND {recorded} "
+                "ORDER BY run_id DESC LIMIT 1"
+            )
+        if not rows:
+            return None
+        run_id, source, options = rows[0]
+        return run_id, source, json.loads(options)
+
+    def add(self, run_id: int, requests: list):
+        """Record DownloadRequests as pending and set their journal_id."""
+        now = time.time()
+        with self._lock:
+            for req in requests:
+                self.execute(
+                    "INSERT INTO jobs (run_id, request, state, updated_at) VALUES (?, ?, ?, ?)",
+                    (run_id, json.dumps(asdict(req)), PENDING, now)
+                )
+                req.journal_id = self.execute("SELECT last_insert_rowid()")[0][0]
+
+    def unfinished(self, run_id: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """(job_id, request fields) of a run's requests not tagged yet, in their original order."""
+        rows = self.execute(
+            "SELECT job_id, request FROM jobs WHERE run_id = ? AND state != ? ORDER BY job_id",
+            (run_id, TAGGED)
+        )
+        return [(job_id, json.loads(data)) for job_id, data in rows]
+
+    def mark(self, job_id: int, state: str, service: str = "",
+             stream_url: str = "", quality: str = ""):
+        if state == RESOLVED:
+            # Never downgrade a track that is already on disk
+            self.execute(
+                "UPDATE jobs SET state = ?, service = ?, stream_url = ?, quality = ?, resolved_at = ?, "
+                "updated_at = ? WHERE job_id = ? AND state NOT IN (?, ?)",
+                (state, service, stream_url, quality, time.time(), time.time(), job_id, DOWNLOADED, TAGGED)
+            )
+        else:
+            self.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE job_id = ?", (state, time.time(), job_id)
+            )
+
+    def resolved_stream(self, job_id: int, service: str) -> Optional[Tuple[str, str]]:
+        """(stream_url, quality) resolved earlier on this service, if still fresh."""
+        rows = self.execute(
+            "SELECT stream_url, quality, resolved_at FROM jobs WHERE job_id = ? AND service = ? AND stream_url != ''",
+            (job_id, service)
+        )
+        if rows and time.time() - rows[0][2] < JOURNAL_STREAM_TTL:
+            return rows[0][0], rows[0][1]
+        return None
+
+    def counts(self, run_id: int) -> Dict[str, int]:
+        """Number of a run's requests in each state."""
+        rows = self.execute("SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state", (run_id,))
+        return dict(rows)
@@ -0,0 +1,214 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from .store import SQLiteStore
+from ..utils.metadata import read_track_info
+from ..constants import SCAN_WORKERS, SCAN_BATCH_SIZE
+
+LOSSY_FORMATS = {"mp3", "m4a", "mp4", "aac"}
+AUDIO_EXTENSIONS = {".flac", ".m4a", ".mp4", ".aac", ".mp3"}
+
+def quality_tier(fmt: str, sample_rate: int = 0, bit_depth: int = 0) -> int:
+    """Delivered quality tier of a file (3 = hi-res, 2 = CD, 1 = lossy), as in QUALITY_RANK."""
+    if fmt in LOSSY_FORMATS and not bit_depth > 16:
+        return 1
+    if (bit_depth or 0) > 16 or (sample_rate or 0) > 48000:
+        return 3
+    return 2
+
+
+class LibraryIndex(SQLiteStore):
+    """
+    Persistent index of audio files on disk (~/.sexify/library.db), mapping
+    ISRC -> path, format, quality, size and mtime. Lets the downloader skip
+    tracks that already exist without touching the network, whatever their
+    file name or format.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS library_files (
+            path TEXT PRIMARY KEY,
+            isrc TEXT NOT NULL,
+            title TEXT NOT NULL,
+            artist TEXT NOT NULL,
+            format TEXT NOT NULL,
+            sample_rate INTEGER NOT NULL,
+            bit_depth INTEGER NOT NULL,
+            quality INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_library_isrc ON library_files (isrc);
+    """
+    COLUMNS = ("path", "isrc", "title", "artist", "format", "sample_rate", "bit_depth", "quality", "size", "mtime")
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__("library.db", path)
+
+    def add(self, path: str, info: Dict):
+        """
+        Index a file. info holds isrc, title, artist, format, sample_rate and
+        bit_depth (see read_track_info); size and mtime are taken from disk.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self.add_many([(path, info, st.st_size, st.st_mtime)])
+
+    def add_many(self, entries: Iterable):
+        """Index (path, info, size, mtime) tuples in one transaction."""
+        rows = []
+        for path, info, size, mtime in entries:
+            fmt = info.get("format", "")
+            sample_rate = int(info.get("sample_rate") or 0)
+            bit_depth = int(info.get("bit_depth") or 0)
+            rows.append((
+                os.path.abspath(path), (info.get("isrc") or "").upper(),
+                info.get("title", ""), info.get("artist", ""), fmt, sample_rate, bit_depth,
+                quality_tier(fmt, sample_rate, bit_depth), size, mtime
+            ))
+        if rows:
+            self.executemany(
+                f"INSERT OR REPLACE INTO library_files ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                rows
+            )
+
+    def remove(self, paths: Iterable[str]):
+        self.executemany("DELETE FROM library_files WHERE path = ?", [(os.path.abspath(p),) for p in paths])
+
+    def find(self, isrc: str, min_quality: int = 0, under: str = "") -> Optional[Dict]:
+        """
+        Best indexed file for an ISRC at or above min_quality, optionally only
+        among files under a directory. Entries whose file is gone or changed
+        on disk are dropped.
+        """
+        if not isrc:
+            return None
+        where, params = self._under(under)
+        rows = self.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM library_files WHERE isrc = ? AND quality >= ?{where} "
+            "ORDER BY quality DESC",
+            (isrc.upper(), min_quality, *params)
+        )
+        entries = self._verified(rows)
+        return entries[0] if entries else None
+
+    def find_many(self, isrcs: Iterable[str], under: str = "") -> Dict[str, Dict]:
+        """
+        Best verified file per ISRC for a whole batch, keyed by uppercased
+        ISRC, optionally only among files under a directory.
+        """
+        wanted = sorted({isrc.upper() for isrc in isrcs if isrc})
+        where, params = self._under(under)
+        found: Dict[str, Dict] = {}
+        for i in range(0, len(wanted), SCAN_BATCH_SIZE):
+            chunk = wanted[i:i + SCAN_BATCH_SIZE]
+            rows = self.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM library_files "
+                f"WHERE isrc IN ({', '.join('?' * len(chunk))}){where} ORDER BY quality DESC",
+                (*chunk, *params)
+            )
+            for entry in self._verified(rows):
+                found.setdefault(entry["isrc"], entry)
+        return found
+
+    def lookup_paths(self, paths: Iterable[str]) -> Dict[str, Dict]:
+        """Verified index entries for a batch of paths, keyed by absolute path."""
+        wanted = sorted({os.path.abspath(p) for p in paths})
+        found: Dict[str, Dict] = {}
+        for i in range(0, len(wanted), SCAN_BATCH_SIZE):
+            chunk = wanted[i:i + SCAN_BATCH_SIZE]
+            rows = self.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM library_files "
+                f"WHERE path IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            for entry in self._verified(rows):
+                found[entry["path"]] = entry
+        return found
+
+    @staticmethod
+    def _under(directory: str) -> Tuple[str, tuple]:
+        """SQL condition (and its parameters) limiting rows to paths under a directory."""
+        if not directory:
+            return "", ()
+        prefix = os.path.join(os.path.abspath(directory), "")
+        return " AND substr(path, 1, ?) = ?", (len(prefix), prefix)
+
+    def _verified(self, rows: List[tuple]) -> List[Dict]:
+        """Entries whose file still exists with the indexed size and mtime; stale ones are removed."""
+        entries = []
+        stale = []
+        for row in rows:
+            entry = dict(zip(self.COLUMNS, row))
+            try:
+                st = os.stat(entry["path"])
+            except OSError:
+                stale.append(entry["path"])
+                continue
+            if st.st_size != entry["size"] or st.st_mtime != entry["mtime"]:
+                stale.append(entry["path"])
+                continue
+            entries.append(entry)
+        if stale:
+            self.remove(stale)
+        return entries
+
+    def entries(self, prefix: str = "") -> List[Dict]:
+        """All indexed files, optionally only those under a directory."""
+        where, params = self._under(prefix)
+        rows = self.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM library_files WHERE 1 = 1{where}", params
+        )
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def scan(self, root: str, workers: int = SCAN_WORKERS) -> Dict[str, int]:
+        """
+        Index every audio file under root. Incremental: only files whose
+        (size, mtime) differ from the index have their tags read, on a pool
+        of worker threads; entries for deleted files are removed.
+        """
+        known = {e["path"]: (e["size"], e["mtime"]) for e in self.entries(root)}
+        seen = set()
+        changed = []
+        for dirpath, dirnames, filenames in os.walk(os.path.abspath(root)):
+            dirnames[:] = [d for d in dirnames if d != "temp_download"]
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() not in AUDIO_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                if known.get(path) != (st.st_size, st.st_mtime):
+                    changed.append((path, st.st_size, st.st_mtime))
+
+        def read(item):
+            return item, read_track_info(item[0])
+
+        unreadable = 0
+        batch = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for (path, size, mtime), info in pool.map(read, changed):
+                if info is None:
+                    # Indexed without an ISRC so it is not re-read until it changes
+                    unreadable += 1
+                    info = {"format": os.path.splitext(path)[1].lower().lstrip(".")}
+                batch.append((path, info, size, mtime))
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    self.add_many(batch)
+                    batch = []
+        self.add_many(batch)
+
+        removed = [path for path in known if path not in seen]
+        self.remove(removed)
+        return {
+            "files": len(seen),
+            "indexed": len(changed) - unreadable,
+            "unchanged": len(seen) - len(changed),
+            "unreadable": unreadable,
+            "removed": len(removed),
+        }
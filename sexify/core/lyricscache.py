@@ -0,0 +1,50 @@
+import re
+import time
+from typing import Optional
+from .store import SQLiteStore
+from ..constants import LYRICS_TTL, LYRICS_NEGATIVE_TTL
+
+def lyrics_key(artist: str, title: str, duration_ms: int = 0) -> str:
+    """Normalized (artist, title, duration in seconds) cache key."""
+    def norm(value: str) -> str:
+        return re.sub(r"\W+", " ", (value or "").lower()).strip()
+    return f"{norm(artist)}|{norm(title)}|{round((duration_ms or 0) / 1000)}"
+
+
+class LyricsCache(SQLiteStore):
+    """
+    Persistent lyrics lookups (~/.sexify/lyrics.db), including tracks LRCLIB
+    has no lyrics for, so re-runs and retags make no lyric requests.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS lyrics (
+            key TEXT PRIMARY KEY,
+            lyrics TEXT NOT NULL,
+            synced INTEGER NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__("lyrics.db", path)
+
+    def get(self, artist: str, title: str, duration_ms: int = 0) -> Optional[str]:
+        """Cached lyrics, "" if known to have none, or None if unknown or expired."""
+        rows = self.execute(
+            "SELECT lyrics, fetched_at FROM lyrics WHERE key = ?",
+            (lyrics_key(artist, title, duration_ms),)
+        )
+        if not rows:
+            return None
+        lyrics, fetched_at = rows[0]
+        ttl = LYRICS_TTL if lyrics else LYRICS_NEGATIVE_TTL
+        if time.time() - fetched_at > ttl:
+            return None
+        return lyrics
+
+    def put(self, artist: str, title: str, duration_ms: int, lyrics: Optional[str], synced: bool = False):
+        """Store a lookup result; pass lyrics=None to record that none exist."""
+        self.execute(
+            "INSERT OR REPLACE INTO lyrics (key, lyrics, synced, fetched_at) VALUES (?, ?, ?, ?)",
+            (lyrics_key(artist, title, duration_ms), lyrics or "", int(synced), time.time())
+        )
@@ -0,0 +1,112 @@
+"""
+Shared retry engine: error classification, jittered exponential backoff
+and a per-run retry budget.
+"""
+import random
+import threading
+from typing import Optional
+import requests
+from ..utils.logger import log_warn
+from ..constants import (
+    MAX_RETRIES,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_BUDGET
+)
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Connection resets, refused connections and broken transfers are transient.
+    Timeouts are not retried: the caller already paid the full timeout and
+    mirror rotation or service fallback is the cheaper next step.
+    """
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.SSLError)):
+        return False
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError))
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code in RETRYABLE_STATUS
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class RetryBudget:
+    """Caps the total number of retries in a run so outages fail fast."""
+
+    def __init__(self, limit: int = RETRY_BUDGET):
+        self.limit = limit
+        self.spent = 0
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self.spent >= self.limit:
+                if not self._warned:
+                    self._warned = True
+                    log_warn(f"Retry budget exhausted ({self.limit}), failing fast", 'sexify')
+                return False
+            self.spent += 1
+            return True
+
+    def reset(self):
+        """Give the full budget back, e.g. at the start of a new run."""
+        with self._lock:
+            self.spent = 0
+            self._warned = False
+
+
+class RetryPolicy:
+    """Jittered exponential backoff bounded by attempts, delay and a shared budget."""
+
+    def __init__(self, max_retries: int = MAX_RETRIES, backoff_factor: float = RETRY_BACKOFF_FACTOR,
+                 base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY,
+                 budget: Optional[RetryBudget] = None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with jitter; a server-provided Retry-After takes precedence."""
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.max_delay, self.base_delay * (self.backoff_factor ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def should_retry(self, attempt: int, max_retries: Optional[int] = None,
+                     retry_after: Optional[float] = None) -> bool:
+        """Check attempt limit, delay cap and budget for a retryable failure."""
+        limit = self.max_retries if max_retries is None else max_retries
+        if attempt >= limit:
+            return False
+        if retry_after is not None and retry_after > self.max_delay:
+            return False
+        return self.budget is None or self.budget.spend()
+
+
+_policy: Optional[RetryPolicy] = None
+_policy_lock = threading.Lock()
+
+def get_retry_policy() -> RetryPolicy:
+    """Process-wide policy sharing one retry budget."""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = RetryPolicy(budget=RetryBudget())
+    return _policy
+
+def reset_retry_budget():
+    """Start a run with the full retry budget, whatever earlier runs spent."""
+    get_retry_policy().budget.reset()
@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Callable, Dict, Iterator, List, Optional
+from .downloader import Downloader, DownloadRequest, equivalent_quality, completed
+from ..utils.logger import log_info, log_error
+
+ALL_SERVICES = ["tidal", "qobuz", "amazon"]
+
+class LoadBalancer:
+    """
+    Spread a batch of download requests across every service that can
+    deliver the requested quality, with a concurrency limit per service,
+    so all providers transfer at the same time. The limits also hold for
+    fallbacks: every attempt on a service runs in one of its slots.
+    """
+
+    def __init__(self, downloader: Downloader, limits: Dict[str, int]):
+        self.downloader = downloader
+        self.limits = {service: int(limit) for service, limit in limits.items() if int(limit) > 0}
+        self.in_flight = {service: 0 for service in self.limits}
+        self._cond = threading.Condition()
+        self._local = threading.local()  # Slot still held from routing, per worker thread
+
+    def eligible_services(self, req: DownloadRequest) -> List[str]:
+        """Services able to deliver the request's quality, preferred service first."""
+        services = [req.service] + [s for s in ALL_SERVICES if s != req.service]
+        return [
+            s for s in services
+            if s in self.limits and equivalent_quality(req.audio_format, req.service, s)
+        ]
+
+    def run_each(self, requests: List[DownloadRequest],
+                 on_start: Optional[Callable[[int, DownloadRequest], None]] = None) -> List["Future[bool]"]:
+        """
+        Download all requests. Returns each request's outcome future, in
+        order; they resolve once the track is tagged (see download_track).
+        """
+        workers = max(1, sum(self.limits.values()))
+        self.downloader.service_slots = self.slot
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(self._run_one, i, req, on_start) for i, req in enumerate(requests)]
+                return [f.result() for f in futures]
+        finally:
+            self.downloader.service_slots = None
+
+    @contextmanager
+    def slot(self, service: str) -> Iterator[None]:
+        """
+        Hold a slot on a service for one attempt. The slot taken when the
+        request was routed serves its first attempt; a fallback gives it up
+        before waiting for the next service, so two services never wait on
+        each other.
+        """
+        held = getattr(self._local, "held", None)
+        if held == service:
+            yield
+            return
+        if held is not None:
+            self._local.held = None
+            self._release(held)
+        if service not in self.limits:
+            yield  # Not balanced (limit 0 or unknown): uncapped, as without --balance
+            return
+        self._acquire([service])
+        try:
+            yield
+        finally:
+            self._release(service)
+
+    def _run_one(self, index: int, req: DownloadRequest,
+                 on_start: Optional[Callable[[int, DownloadRequest], None]]) -> "Future[bool]":
+        candidates = self.eligible_services(req)
+        if not candidates:
+            # Quality only available on the requested service, or service not in the pool
+            candidates = [req.service]
+            with self._cond:
+                self.limits.setdefault(req.service, 1)
+                self.in_flight.setdefault(req.service, 0)
+
+        service = self._acquire(candidates)
+        self._local.held = service
+        try:
+            if on_start:
+                on_start(index, req)
+            # Racing every service at once would bypass the per-service limits
+            routed = replace(req, route=service, speculative=False)
+            if service != req.service:
+                log_info(f"Routed to {service.upper()}", 'sexify')
+            return self.downloader.download_track(routed)
+        except Exception as e:
+            log_error(f"Download crashed: {e}", 'sexify')
+            return completed(False)
+        finally:
+            if self._local.held is not None:
+                self._local.held = None
+                self._release(service)
+
+    def _acquire(self, candidates: List[str]) -> str:
+        """Wait for a free slot and take the least loaded candidate service."""
+        with self._cond:
+            while True:
+                free = [s for s in candidates if self.in_flight[s] < self.limits[s]]
+                if free:
+                    service = min(free, key=lambda s: (self.in_flight[s] / self.limits[s], candidates.index(s)))
+                    self.in_flight[service] += 1
+                    return service
+                self._cond.wait()
+
+    def _release(self, service: str):
+        with self._cond:
+            self.in_flight[service] -= 1
+            self._cond.notify_all()
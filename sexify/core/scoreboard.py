@@ -0,0 +1,78 @@
+import time
+from typing import Dict, List, Optional
+from .store import SQLiteStore
+from ..constants import (
+    SCOREBOARD_WINDOW,
+    SCOREBOARD_MAX_AGE,
+    SCOREBOARD_PRIOR_SECONDS,
+    SCOREBOARD_PREFERRED_BONUS
+)
+
+class ServiceScoreboard(SQLiteStore):
+    """
+    Per-service record of recent download attempts (~/.sexify/stats.db).
+    Tracks success rate, time to first byte (stream resolution latency) and
+    throughput, and orders the fallback chain by expected time to a file.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS service_attempts (
+            service TEXT NOT NULL,
+            ok INTEGER NOT NULL,
+            ttfb REAL NOT NULL,
+            bytes INTEGER NOT NULL,
+            seconds REAL NOT NULL,
+            at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_service_attempts ON service_attempts (service, at);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__("stats.db", path)
+        self.execute("DELETE FROM service_attempts WHERE at < ?", (time.time() - SCOREBOARD_MAX_AGE,))
+
+    def record(self, service: str, ok: bool, ttfb: float, nbytes: int = 0, seconds: float = 0.0):
+        """Record one attempt: ttfb is time until a stream was ready, seconds the transfer time."""
+        self.execute(
+            "INSERT INTO service_attempts (service, ok, ttfb, bytes, seconds, at) VALUES (?, ?, ?, ?, ?, ?)",
+            (service, int(ok), ttfb, nbytes, seconds, time.time())
+        )
+
+    def stats(self, service: str) -> Dict[str, float]:
+        """Summarize the last SCOREBOARD_WINDOW attempts for a service."""
+        rows = self.execute(
+            "SELECT ok, ttfb, bytes, seconds FROM service_attempts WHERE service = ? AND at >= ? "
+            "ORDER BY at DESC LIMIT ?",
+            (service, time.time() - SCOREBOARD_MAX_AGE, SCOREBOARD_WINDOW)
+        )
+        successes = [r for r in rows if r[0]]
+        transfer_bytes = sum(r[2] for r in successes)
+        transfer_seconds = sum(r[3] for r in successes)
+        return {
+            "attempts": len(rows),
+            "success_rate": (len(successes) + 1) / (len(rows) + 2),  # Laplace-smoothed
+            "ttfb": sum(r[1] for r in rows) / len(rows) if rows else 0.0,
+            "throughput": transfer_bytes / transfer_seconds if transfer_seconds > 0 else 0.0,
+            "track_bytes": transfer_bytes / len(successes) if successes else 0.0,
+        }
+
+    def expected_cost(self, service: str) -> float:
+        """Expected seconds spent per delivered track when trying this service."""
+        stats = self.stats(service)
+        if not stats["attempts"]:
+            return SCOREBOARD_PRIOR_SECONDS / stats["success_rate"]
+        attempt_seconds = stats["ttfb"]
+        if stats["throughput"] > 0:
+            attempt_seconds += stats["track_bytes"] / stats["throughput"]
+        return attempt_seconds / stats["success_rate"]
+
+    def order(self, preferred: str, services: List[str]) -> List[str]:
+        """
+        Order services by expected cost. The preferred service gets a bonus so it
+        stays first unless another service is clearly better; ties keep the
+        given order.
+        """
+        def cost(service: str) -> float:
+            value = self.expected_cost(service)
+            return value / SCOREBOARD_PREFERRED_BONUS if service == preferred else value
+
+        return sorted(services, key=cost)
@@ -0,0 +1,236 @@
+"""
+`sexify serve`: a resident downloader behind a local HTTP job API.
+
+One Downloader (sessions, caches, rate limiters, Spotify token, tag
+workers) is kept warm across jobs. Jobs are queued and run one after
+another, each as a journaled run whose id is the job id, so progress is
+the journal's per-state counts and finished jobs stay queryable after a
+restart.
+
+    POST /jobs       {"urls": [...], "service": ..., "quality": ..., ...} -> 202 job
+    GET  /jobs       all jobs
+    GET  /jobs/<id>  one job
+"""
+import json
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from .config import config
+from .downloader import Downloader
+from .journal import JobJournal, TAGGED, FAILED as TRACK_FAILED
+from .jobs import enumerate_requests, download_all, resolve_quality
+from .retry import reset_retry_budget
+from ..utils.logger import log_info, log_error, log_success, log_debug
+from ..constants import SERVE_MAX_BODY
+
+SERVICES = ("tidal", "qobuz", "amazon")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+INTERRUPTED = "interrupted"  # Known only from the journal: the server stopped before it finished
+
+@dataclass
+class Job:
+    id: int
+    urls: List[str]
+    options: Dict[str, Any]
+    status: str = QUEUED
+    error: str = ""
+    run_id: int = 0
+    total: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: float = 0
+    finished_at: float = 0
+
+
+class JobQueue:
+    """Queue of download jobs run one at a time on a shared, warm Downloader."""
+
+    def __init__(self):
+        self.journal = JobJournal()
+        self.downloader = Downloader()
+        self.downloader.journal = self.journal
+        self._jobs: Dict[int, Job] = {}
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._runner = threading.Thread(target=self._run, name="job-runner", daemon=True)
+        self._runner.start()
+
+    def submit(self, body: Dict[str, Any]) -> Job:
+        """Validate and queue a job submission. Raises ValueError if it is malformed."""
+        urls = body.get("urls")
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls or not all(isinstance(u, str) and u.strip() for u in urls):
+            raise ValueError("'urls' must be a non-empty list of URLs")
+        service = body.get("service") or config.get("service", "tidal")
+        if service not in SERVICES:
+            raise ValueError(f"Unknown service: {service}")
+
+        options = dict(
+            service=service,
+            quality=resolve_quality(service, body.get("quality")),
+            output=body.get("output") or config.get("output_dir"),
+            lyrics=bool(body.get("lyrics", config.get("embed_lyrics", True))),
+            cover_max=bool(body.get("cover_max", config.get("embed_max_quality_cover", True))),
+            speculative=bool(body.get("speculative", config.get("speculative_resolve", False))),
+            balance=bool(body.get("balance", False)),
+        )
+        urls = [u.strip() for u in urls]
+        run_id = self.journal.start_run(" ".join(urls), options)
+        job = Job(id=run_id, urls=urls, options=options, run_id=run_id)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._queue.put(job)
+        log_info(f"Queued job {job.id}: {len(job.urls)} URL(s)", 'sexify')
+        return job
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            job = self._from_journal(job_id)
+        return self._describe(job) if job else None
+
+    def _from_journal(self, run_id: int) -> Optional[Job]:
+        """A job from an earlier server (or CLI) process, rebuilt from its journaled run."""
+        run = self.journal.run(run_id)
+        if run is None:
+            return None
+        counts = self.journal.counts(run_id)
+        return Job(
+            id=run_id, urls=run["source"].split(" "), options=run["options"],
+            status=DONE if run["finished_at"] else INTERRUPTED, run_id=run_id,
+            total=sum(counts.values()), succeeded=counts.get(TAGGED, 0), failed=counts.get(TRACK_FAILED, 0),
+            created_at=run["created_at"], finished_at=run["finished_at"] or 0,
+        )
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [self._describe(job) for job in jobs]
+
+    def _describe(self, job: Job) -> Dict[str, Any]:
+        info = asdict(job)
+        info["tracks"] = self.journal.counts(job.run_id) if job.run_id else {}
+        info["queue_position"] = self._position(job)
+        return info
+
+    def _position(self, job: Job) -> int:
+        if job.status != QUEUED:
+            return 0
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == QUEUED and j.id <= job.id)
+
+    def stop(self):
+        """Finish the current job, then stop the runner. Jobs still queued are dropped."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put(None)
+        self._runner.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                self._execute(job)
+                job.status = DONE
+                log_success(
+                    f"Job {job.id} complete. Success: {job.succeeded}, Failed: {job.failed}, Skipped: {job.skipped}",
+                    'sexify'
+                )
+            except Exception as e:
+                job.status = FAILED
+                job.error = str(e)
+                log_error(f"Job {job.id} failed: {e}", 'sexify')
+            job.finished_at = time.time()
+
+    def _execute(self, job: Job):
+        reset_retry_budget()  # Each job gets the full budget, not what earlier jobs left
+        options = {k: v for k, v in job.options.items() if k != "balance"}
+        requests, job.duplicates = enumerate_requests(self.downloader.spotify, job.urls, options)
+        if not requests:
+            raise ValueError("No tracks found to download")
+        job.total = len(requests)
+        self.journal.add(job.run_id, requests)
+
+        results, job.skipped = download_all(self.downloader, requests, job.options["balance"])
+        job.succeeded = sum(1 for ok in results if ok)
+        job.failed = len(results) - job.succeeded
+        self.journal.finish_run(job.run_id)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = "sexify"
+
+    def do_GET(self):
+        jobs: JobQueue = self.server.jobs
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if parts == ["jobs"]:
+            return self._reply(200, {"jobs": jobs.all()})
+        if len(parts) == 2 and parts[0] == "jobs" and parts[1].isdigit():
+            job = jobs.get(int(parts[1]))
+            if job:
+                return self._reply(200, job)
+            return self._reply(404, {"error": "No such job"})
+        self._reply(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0].strip("/") != "jobs":
+            return self._reply(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= SERVE_MAX_BODY:
+            return self._reply(400, {"error": f"Content-Length must be between 0 and {SERVE_MAX_BODY}"})
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Expected a JSON object")
+            job = self.server.jobs.submit(body)
+        except ValueError as e:  # Includes malformed JSON
+            return self._reply(400, {"error": str(e)})
+        self._reply(202, self.server.jobs.get(job.id))
+
+    def _reply(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        log_debug(f"{self.address_string()} {format % args}", 'sexify')
+
+
+def serve(host: str, port: int):
+    """Run the job API until interrupted."""
+    httpd = ThreadingHTTPServer((host, port), JobRequestHandler)
+    httpd.daemon_threads = True
+    httpd.jobs = JobQueue()
+    log_info(f"Listening on http://{host}:{port} (POST /jobs, GET /jobs/<id>)", 'sexify')
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        log_info("Shutting down after the current job...", 'sexify')
+    finally:
+        httpd.server_close()
+        httpd.jobs.stop()
@@ -0,0 +1,48 @@
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+from ..core.config import config
+from ..utils.logger import log_warn
+
+class SQLiteStore:
+    """
+    Thread-safe SQLite database under ~/.sexify.
+    Subclasses set SCHEMA; falls back to an in-memory database if the
+    file cannot be opened so a broken cache never stops a download.
+    """
+    SCHEMA = ""
+
+    def __init__(self, filename: str, path: Optional[str] = None):
+        self.path = path or str(config.config_dir / filename)
+        self._lock = threading.RLock()
+        try:
+            self._conn = self._connect(self.path)
+        except sqlite3.Error as e:
+            log_warn(f"Could not open {self.path} ({e}), using in-memory store", 'sexify')
+            self.path = ":memory:"
+            self._conn = self._connect(self.path)
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        conn.commit()
+        return conn
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> List[Tuple]:
+        with self._lock:
+            cur = self._conn.execute(sql, tuple(params))
+            rows = cur.fetchall()
+            self._conn.commit()
+            return rows
+
+    def executemany(self, sql: str, seq: Iterable[Iterable[Any]]):
+        with self._lock:
+            self._conn.executemany(sql, seq)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
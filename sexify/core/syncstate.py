@@ -0,0 +1,94 @@
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from .store import SQLiteStore
+
+DOWNLOADED = "downloaded"  # File written by a sync of this playlist
+PRESENT = "present"  # Already on disk when synced: never pruned
+FAILED = "failed"
+REMOVED = "removed"  # Downloaded, then gone from the playlist; file kept (not pruned)
+
+class PlaylistSyncState(SQLiteStore):
+    """
+    Last synced snapshot and per-track state of mirrored playlists
+    (~/.sexify/sync.db), so `sexify sync` only downloads what changed.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS playlists (
+            playlist_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            snapshot_id TEXT NOT NULL,
+            synced_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS playlist_tracks (
+            playlist_id TEXT NOT NULL,
+            track_id TEXT NOT NULL,
+            isrc TEXT NOT NULL,
+            path TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (playlist_id, track_id)
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__("sync.db", path)
+
+    def snapshot(self, playlist_id: str) -> Optional[str]:
+        rows = self.execute("SELECT snapshot_id FROM playlists WHERE playlist_id = ?", (playlist_id,))
+        return rows[0][0] if rows else None
+
+    def set_snapshot(self, playlist_id: str, name: str, snapshot_id: str):
+        self.execute(
+            "INSERT OR REPLACE INTO playlists (playlist_id, name, snapshot_id, synced_at) VALUES (?, ?, ?, ?)",
+            (playlist_id, name, snapshot_id, time.time())
+        )
+
+    def tracks(self, playlist_id: str) -> Dict[str, Tuple[str, str, str]]:
+        """track_id -> (isrc, path, state)."""
+        rows = self.execute(
+            "SELECT track_id, isrc, path, state FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,)
+        )
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def has_failures(self, playlist_id: str) -> bool:
+        return bool(self.execute(
+            "SELECT 1 FROM playlist_tracks WHERE playlist_id = ? AND state = ? LIMIT 1", (playlist_id, FAILED)
+        ))
+
+    def set_track(self, playlist_id: str, track_id: str, isrc: str, path: str, state: str):
+        self.execute(
+            "INSERT OR REPLACE INTO playlist_tracks (playlist_id, track_id, isrc, path, state, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (playlist_id, track_id, isrc, path, state, time.time())
+        )
+
+    def mark_removed(self, playlist_id: str, track_ids: Iterable[str]):
+        """
+        Record tracks gone from the playlist. Only files the sync downloaded
+        are kept as REMOVED (prune candidates); other tracks are forgotten.
+        """
+        track_ids = list(track_ids)
+        with self._lock:
+            self.executemany(
+                "UPDATE playlist_tracks SET state = ?, updated_at = ? "
+                "WHERE playlist_id = ? AND track_id = ? AND state = ?",
+                [(REMOVED, time.time(), playlist_id, track_id, DOWNLOADED) for track_id in track_ids]
+            )
+            self.executemany(
+                "DELETE FROM playlist_tracks WHERE playlist_id = ? AND track_id = ? AND state != ?",
+                [(playlist_id, track_id, REMOVED) for track_id in track_ids]
+            )
+
+    def path_in_use(self, path: str, playlist_id: str, track_id: str) -> bool:
+        """Whether a track other than this one, in any playlist, still uses the file."""
+        return bool(self.execute(
+            "SELECT 1 FROM playlist_tracks WHERE path = ? AND state != ? "
+            "AND NOT (playlist_id = ? AND track_id = ?) LIMIT 1",
+            (path, REMOVED, playlist_id, track_id)
+        ))
+
+    def forget(self, playlist_id: str, track_ids: Iterable[str]):
+        self.executemany(
+            "DELETE FROM playlist_tracks WHERE playlist_id = ? AND track_id = ?",
+            [(playlist_id, track_id) for track_id in track_ids]
+        )
@@ -0,0 +1,118 @@
+"""
+Tagging worker pool. Tag writes (mutagen saves, single-pass FLAC copies)
+run in separate processes so download threads never wait on them and the
+interpreter servicing sockets keeps the GIL. Large covers are handed to
+workers through shared memory instead of being pickled.
+"""
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait as wait_all
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Set
+from ..utils.metadata import embed_metadata, write_flac_single_pass
+from ..utils.logger import log_error, log_debug
+from ..constants import TAG_SHM_THRESHOLD
+
+def tag_file(src: Optional[str], dst: str, metadata: Dict[str, str],
+             cover_data: Optional[bytes] = None) -> bool:
+    """
+    Tag dst. With src set, the FLAC is first moved from src to dst in a
+    single pass (falling back to a move plus an in-place tag write).
+    """
+    if src:
+        try:
+            return write_flac_single_pass(src, dst, metadata, cover_data=cover_data)
+        except Exception:
+            if os.path.exists(src):
+                shutil.move(src, dst)
+    return embed_metadata(dst, metadata, cover_data=cover_data)
+
+def _tag_job(src: Optional[str], dst: str, metadata: Dict[str, str],
+             cover_data: Optional[bytes], shm_name: Optional[str], shm_size: int) -> bool:
+    """Worker entry point: read the cover from shared memory if needed, then tag."""
+    if shm_name:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            cover_data = bytes(shm.buf[:shm_size])
+        finally:
+            shm.close()
+    return tag_file(src, dst, metadata, cover_data)
+
+
+class TagPool:
+    """Process pool for tag writes. workers=0 tags synchronously in the caller."""
+
+    def __init__(self, workers: int = 0):
+        self.workers = max(0, int(workers or 0))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, src: Optional[str], dst: str, metadata: Dict[str, str],
+               cover_data: Optional[bytes] = None) -> Future:
+        if self.workers == 0:
+            future: Future = Future()
+            try:
+                future.set_result(tag_file(src, dst, metadata, cover_data))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        shm = None
+        if cover_data and len(cover_data) >= TAG_SHM_THRESHOLD:
+            shm = shared_memory.SharedMemory(create=True, size=len(cover_data))
+            shm.buf[:len(cover_data)] = cover_data
+        try:
+            if shm:
+                future = self._get_pool().submit(_tag_job, src, dst, metadata, None, shm.name, len(cover_data))
+            else:
+                future = self._get_pool().submit(_tag_job, src, dst, metadata, cover_data, None, 0)
+        except Exception:
+            if shm:
+                shm.close()
+                shm.unlink()
+            raise
+
+        def done(f: Future):
+            with self._lock:
+                self._pending.discard(f)
+            if shm:
+                shm.close()
+                shm.unlink()
+            name = os.path.basename(dst)
+            if f.exception() is not None:
+                log_error(f"- Tagging failed for {name}: {f.exception()}", 'sexify')
+            elif not f.result():
+                log_error(f"- Tagging failed for {name}", 'sexify')
+            else:
+                log_debug(f"Tagged {name}", 'sexify')
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(done)
+        return future
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process full of download threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def wait(self):
+        """Wait for the tag writes submitted so far, keeping the workers running."""
+        with self._lock:
+            pending = list(self._pending)
+        wait_all(pending)
+
+    def drain(self):
+        """Wait for every queued tag write to finish, then stop the workers."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
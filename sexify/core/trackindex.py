@@ -0,0 +1,51 @@
+import time
+from typing import Optional
+from .store import SQLiteStore
+from ..constants import INDEX_NEGATIVE_TTL
+
+NOT_AVAILABLE = ""  # Stored service ID for tracks a service does not carry
+
+class TrackIndex(SQLiteStore):
+    """
+    Persistent ISRC -> service track ID index (~/.sexify/index.db).
+    Records Qobuz track IDs, Tidal track IDs and Amazon ASINs, including
+    "not available" results, so known tracks skip service resolution.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS service_ids (
+            isrc TEXT NOT NULL,
+            service TEXT NOT NULL,
+            service_id TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (isrc, service)
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__("index.db", path)
+
+    def get(self, isrc: str, service: str) -> Optional[str]:
+        """
+        Return the cached service ID, NOT_AVAILABLE if the service is known
+        not to carry the track, or None if it has not been resolved yet.
+        """
+        if not isrc:
+            return None
+        rows = self.execute(
+            "SELECT service_id, updated_at FROM service_ids WHERE isrc = ? AND service = ?",
+            (isrc.upper(), service)
+        )
+        if not rows:
+            return None
+        service_id, updated_at = rows[0]
+        if service_id == NOT_AVAILABLE and time.time() - updated_at > INDEX_NEGATIVE_TTL:
+            return None
+        return service_id
+
+    def put(self, isrc: str, service: str, service_id: str):
+        if not isrc:
+            return
+        self.execute(
+            "INSERT OR REPLACE INTO service_ids (isrc, service, service_id, updated_at) VALUES (?, ?, ?, ?)",
+            (isrc.upper(), service, str(service_id), time.time())
+        )
@@ -0,0 +1,350 @@
+"""
+Shared HTTP transport for all service clients.
+Sessions created here share one keep-alive connection pool, per-host
+connection caps, an optional global bandwidth budget, in-flight accounting,
+retries of transient failures and timeouts learned from per-endpoint latency.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from ..core.config import config
+from ..core.retry import (
+    IDEMPOTENT_METHODS,
+    get_retry_policy,
+    is_retryable_error,
+    is_retryable_status,
+    parse_retry_after
+)
+from ..utils.logger import log_debug
+from ..constants import (
+    POOL_MAX_HOSTS,
+    DEFAULT_TIMEOUT,
+    LATENCY_WINDOW,
+    LATENCY_MIN_SAMPLES,
+    ADAPTIVE_TIMEOUT_MULTIPLIER,
+    ADAPTIVE_CONNECT_TIMEOUT,
+    ADAPTIVE_CONNECT_FLOOR,
+    ADAPTIVE_READ_FLOOR,
+    LATENCY_ENDPOINT_DEPTH
+)
+
+class HostLimiter:
+    """Caps concurrent requests per host and tracks in-flight counts."""
+
+    def __init__(self, per_host: int):
+        self.per_host = max(1, per_host)
+        self._cond = threading.Condition()
+        self._in_flight: Dict[str, int] = {}
+
+    def acquire(self, host: str):
+        with self._cond:
+            while self._in_flight.get(host, 0) >= self.per_host:
+                self._cond.wait()
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+
+    def release(self, host: str):
+        with self._cond:
+            count = self._in_flight.get(host, 0) - 1
+            if count > 0:
+                self._in_flight[host] = count
+            else:
+                self._in_flight.pop(host, None)
+            self._cond.notify_all()
+
+    def in_flight(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(self._in_flight)
+
+
+def endpoint_key(url: str) -> str:
+    """
+    Host plus the leading path segments of a URL, with ID-like segments
+    (containing digits, or very long) collapsed, e.g. "host/dl/*". Search,
+    submit and poll endpoints on one host get separate latency stats.
+    """
+    parsed = urlparse(url)
+    segments = [seg for seg in parsed.path.split("/") if seg][:LATENCY_ENDPOINT_DEPTH]
+    segments = ["*" if any(c.isdigit() for c in seg) or len(seg) > 24 else seg for seg in segments]
+    return "/".join([parsed.hostname or ""] + segments)
+
+
+class LatencyTracker:
+    """
+    Learns per-endpoint response latency (time to headers) and derives
+    connect and read timeouts from the observed p99, bounded by floors and
+    by the caller's own timeout as the ceiling. Streamed bodies keep the
+    caller's read timeout: it applies to every socket read of the body,
+    which time to headers says nothing about.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def record_timeout(self, key: str, seconds: float):
+        """
+        Record a read timeout as a sample at the timeout it hit. One timeout
+        leaves p99 alone; repeated ones raise it step by step, so a slow
+        endpoint earns a longer timeout while a dead one keeps failing fast.
+        """
+        self.record(key, seconds)
+
+    def p99(self, key: str) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return samples[int(0.99 * (len(samples) - 1))]
+
+    def timeouts(self, key: str, timeout, stream: bool = False) -> Tuple[float, float]:
+        """(connect, read) timeouts for a request whose caller asked for `timeout`."""
+        if isinstance(timeout, tuple):
+            connect_ceiling, read_ceiling = timeout
+        else:
+            connect_ceiling = read_ceiling = timeout if timeout is not None else DEFAULT_TIMEOUT
+        connect_ceiling = min(connect_ceiling, ADAPTIVE_CONNECT_TIMEOUT)
+
+        p99 = self.p99(key)
+        if p99 is None:
+            return connect_ceiling, read_ceiling
+        learned = p99 * ADAPTIVE_TIMEOUT_MULTIPLIER
+        connect = min(connect_ceiling, max(ADAPTIVE_CONNECT_FLOOR, learned))
+        if stream:
+            return connect, read_ceiling
+        return connect, min(read_ceiling, max(ADAPTIVE_READ_FLOOR, learned))
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Observed p99 latency per endpoint."""
+        with self._lock:
+            keys = list(self._samples)
+        return {key: self.p99(key) for key in keys}
+
+
+class BandwidthShaper:
+    """Token bucket shared by every transfer. A rate of 0 disables shaping."""
+
+    def __init__(self, bytes_per_sec: int = 0):
+        self.rate = max(0, int(bytes_per_sec or 0))
+        self._lock = threading.Lock()
+        self._allowance = float(self.rate)
+        self._last = time.monotonic()
+
+    def consume(self, nbytes: int):
+        if self.rate <= 0 or nbytes <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= nbytes
+            delay = -self._allowance / self.rate if self._allowance < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ShapedSession(requests.Session):
+    """requests.Session that goes through the shared Transport limits."""
+
+    def __init__(self, transport: "Transport"):
+        super().__init__()
+        self.transport = transport
+        # Reuse the process-wide pool so TLS connections survive across clients
+        self.mount("https://", transport.adapter)
+        self.mount("http://", transport.adapter)
+
+    def close(self):
+        """The connection pool belongs to the transport and outlives any one session."""
+
+    def request(self, method, url, *args, retries: Optional[int] = None, **kwargs):
+        """
+        Send a request, retrying transient failures of idempotent methods with
+        the shared retry policy. Pass retries=0 to disable, e.g. when the caller
+        has alternative mirrors to try instead.
+        """
+        policy = self.transport.retry_policy
+        if method.upper() not in IDEMPOTENT_METHODS:
+            retries = 0
+        attempt = 0
+        while True:
+            try:
+                resp = self._send(method, url, *args, **kwargs)
+            except requests.RequestException as e:
+                if not (is_retryable_error(e) and policy.should_retry(attempt, retries)):
+                    raise
+                delay = policy.delay(attempt)
+                log_debug(f"Retrying {urlparse(url).hostname} in {delay:.1f}s: {e}", 'sexify')
+            else:
+                if not is_retryable_status(resp.status_code):
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if not policy.should_retry(attempt, retries, retry_after):
+                    return resp
+                resp.close()
+                delay = policy.delay(attempt, retry_after)
+                log_debug(f"Retrying {urlparse(url).hostname} in {delay:.1f}s: HTTP {resp.status_code}", 'sexify')
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method, url, *args, **kwargs):
+        host = urlparse(url).hostname or ""
+        latency = self.transport.latency
+        endpoint = endpoint_key(url)
+        if latency is not None:
+            kwargs["timeout"] = latency.timeouts(endpoint, kwargs.get("timeout"), bool(kwargs.get("stream")))
+        limiter = self.transport.hosts
+        limiter.acquire(host)
+        try:
+            resp = super().request(method, url, *args, **kwargs)
+        except BaseException as e:
+            limiter.release(host)
+            if latency is not None and isinstance(e, requests.exceptions.ReadTimeout):
+                latency.record_timeout(endpoint, kwargs["timeout"][1])
+            raise
+        if latency is not None:
+            latency.record(endpoint, resp.elapsed.total_seconds())
+
+        if not kwargs.get("stream"):
+            limiter.release(host)
+            self.transport.shaper.consume(len(resp.content))
+            return resp
+
+        self._hold_slot(resp, host, method, url, args, kwargs)
+        return resp
+
+    def _hold_slot(self, resp: requests.Response, host: str, method, url, args, kwargs):
+        """
+        Keep the host slot until a streamed response is consumed or closed.
+        A body broken off by a transient error is resumed with a Range request
+        from the last byte received, under the shared retry policy.
+        """
+        transport = self.transport
+        lock = threading.Lock()
+        released = [False]
+        resumed: list = []
+
+        def release():
+            with lock:
+                if released[0]:
+                    return
+                released[0] = True
+            transport.hosts.release(host)
+
+        iter_content = resp.iter_content
+        close = resp.close
+
+        def resume(error: requests.RequestException, offset: int, attempt: int, chunk_size, decode_unicode):
+            headers = dict(kwargs.get("headers") or {})
+            policy = transport.retry_policy
+            if (method.upper() not in IDEMPOTENT_METHODS or "Range" in headers or decode_unicode
+                    or resp.headers.get("Content-Encoding", "identity") != "identity"
+                    or not is_retryable_error(error) or not policy.should_retry(attempt)):
+                raise error
+            delay = policy.delay(attempt)
+            log_debug(f"Resuming {host} at byte {offset} in {delay:.1f}s: {error}", 'sexify')
+            time.sleep(delay)
+            headers["Range"] = f"bytes={offset}-"
+            # The host slot is still held by this transfer: bypass the limiter
+            again = requests.Session.request(self, method, url, *args, **dict(kwargs, headers=headers))
+            resumed.append(again)
+            if again.status_code != 206 or not again.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                raise error  # Server cannot resume; the caller restarts or falls back
+            return again.iter_content(chunk_size, decode_unicode)
+
+        def shaped_iter_content(chunk_size=1, decode_unicode=False):
+            body = iter_content(chunk_size, decode_unicode)
+            received = 0
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        chunk = next(body)
+                    except StopIteration:
+                        return
+                    except requests.RequestException as e:
+                        body = resume(e, received, attempt, chunk_size, decode_unicode)
+                        attempt += 1
+                        continue
+                    received += len(chunk)
+                    transport.shaper.consume(len(chunk))
+                    yield chunk
+            finally:
+                release()
+
+        def closing():
+            try:
+                close()
+                for again in resumed:
+                    again.close()
+            finally:
+                release()
+
+        resp.iter_content = shaped_iter_content
+        resp.close = closing
+
+
+class Transport:
+    """Process-wide connection pool and limits shared by all sessions."""
+
+    def __init__(self, per_host_connections: int = 4, max_bandwidth: int = 0,
+                 concurrent_downloads: int = 1, adaptive_timeouts: bool = True):
+        self.hosts = HostLimiter(per_host_connections)
+        self.shaper = BandwidthShaper(max_bandwidth)
+        self.retry_policy = get_retry_policy()
+        self.latency = LatencyTracker() if adaptive_timeouts else None
+        # One pool per host, each large enough for every parallel download
+        self.adapter = HTTPAdapter(
+            pool_connections=POOL_MAX_HOSTS,
+            pool_maxsize=max(self.hosts.per_host, int(concurrent_downloads or 1)),
+        )
+
+    def session(self) -> ShapedSession:
+        return ShapedSession(self)
+
+    def in_flight(self) -> Dict[str, int]:
+        """Current number of in-flight requests per host."""
+        return self.hosts.in_flight()
+
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> Transport:
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport(
+                per_host_connections=config.get("network.per_host_connections", 4),
+                max_bandwidth=config.get("network.max_bandwidth", 0),
+                concurrent_downloads=config.get("concurrent_downloads", 5),
+                adaptive_timeouts=config.get("network.adaptive_timeouts", True),
+            )
+    return _transport
+
+def create_session() -> requests.Session:
+    """Session for a service client, bound to the shared transport."""
+    return get_transport().session()
+
+def read_head(session: requests.Session, url: str, nbytes: int) -> Optional[bytes]:
+    """First nbytes of a resource, fetched with a ranged request. None if the request fails."""
+    try:
+        with session.get(url, headers={"Range": f"bytes=0-{nbytes - 1}"}, stream=True,
+                         timeout=DEFAULT_TIMEOUT) as r:
+            if r.status_code not in (200, 206):
+                return None
+            head = b""
+            for chunk in r.iter_content(chunk_size=nbytes):
+                head += chunk
+                if len(head) >= nbytes:
+                    break
+        return head[:nbytes]
+    except requests.RequestException as e:
+        log_debug(f"Could not read {urlparse(url).hostname}: {e}", 'sexify')
+        return None
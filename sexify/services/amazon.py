@@ -2,24 +2,30 @@ import requests
 import time
 import base64
 import os
+import threading
 import urllib.parse
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
 from .songlink import SongLinkClient
 from ..utils.progress import ProgressManager
+from ..utils.metadata import flac_stream_info
 from ..utils.logger import log_info, log_error, log_sub
 from ..core.config import config
+from ..core.transport import create_session, read_head
 from ..constants import (
     AMAZON_MAX_POLL_ATTEMPTS,
     AMAZON_POLL_INTERVAL,
+    AMAZON_PREPARED_FILES,
     DOWNLOAD_CHUNK_SIZE,
     DEFAULT_TIMEOUT,
-    DOWNLOAD_TIMEOUT
+    DOWNLOAD_TIMEOUT,
+    FLAC_PROBE_BYTES
 )
 
 class AmazonDownloader:
-    def __init__(self):
-        self.session = requests.Session()
-        self.songlink = SongLinkClient()
+    def __init__(self, songlink: Optional[SongLinkClient] = None):
+        self.session = create_session()
+        self.songlink = songlink or SongLinkClient()
         primary_region = config.get("amazon.region", "US").lower()
         self.regions = [primary_region] if primary_region in ["us", "eu"] else ["us"]
         if "eu" not in self.regions:
@@ -27,28 +33,44 @@ class AmazonDownloader:
         elif "us" not in self.regions:
             self.regions.append("us")
         self.progress = ProgressManager.get_instance()
+        # file URL -> (region, Amazon URL), so a failed fetch can move on to the next region
+        self._prepared: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._prepared_lock = threading.Lock()
         
-    def get_amazon_url(self, spotify_id: str) -> Optional[str]:
+    def get_amazon_url(self, spotify_id: str, links: Optional[Dict[str, str]] = None) -> Optional[str]:
         """Get Amazon Music URL for a Spotify track using SongLink."""
-        log_info("Obtaining Amazon URL via SongLink", 'amazon')
-        links = self.songlink.get_links(spotify_id)
+        if links is None:
+            log_info("Obtaining Amazon URL via SongLink", 'amazon')
+            links = self.songlink.get_links(spotify_id)
         if "amazon" in links and links["amazon"]:
             url = links["amazon"]
             log_sub(f"+ {url}", 'amazon')
-            if "trackAsin=" in url:
-                try:
-                    parsed = urllib.parse.urlparse(url)
-                    params = urllib.parse.parse_qs(parsed.query)
-                    track_asin = params.get('trackAsin', [None])[0]
-                    if track_asin:
-                        base = base64.b64decode("aHR0cHM6Ly9tdXNpYy5hbWF6b24uY29tL3RyYWNrcy8=").decode()
-                        return f"{base}{track_asin}?musicTerritory=US"
-                except (KeyError, IndexError, ValueError) as e:
-                    log_sub(f"Failed to parse track ASIN, using original URL: {e}", 'amazon')
+            track_asin = self.extract_asin(url)
+            if track_asin:
+                return self.track_url(track_asin)
             return url
         log_error("- No Amazon URL found", 'amazon')
         return None
 
+    def extract_asin(self, url: str) -> Optional[str]:
+        """Extract the track ASIN from an Amazon Music URL."""
+        if "trackAsin=" not in url:
+            return None
+        try:
+            parsed = urllib.parse.urlparse(url)
+            params = urllib.parse.parse_qs(parsed.query)
+            return params.get('trackAsin', [None])[0]
+        except (KeyError, IndexError, ValueError) as e:
+            log_sub(f"Failed to parse track ASIN, using original URL: {e}", 'amazon')
+        return None
+
+    def track_url(self, track_asin: str) -> str:
+        """Build the Amazon Music track URL for an ASIN."""
+        if track_asin.startswith("http"):
+            return track_asin
+        base = base64.b64decode("aHR0cHM6Ly9tdXNpYy5hbWF6b24uY29tL3RyYWNrcy8=").decode()
+        return f"{base}{track_asin}?musicTerritory=US"
+
     def download(self, amazon_url: str, output_path: str) -> bool:
         """
         Download track from Amazon Music using DoubleDouble service.
@@ -57,64 +79,131 @@ class AmazonDownloader:
         fallback to alternative regions if primary fails.
         """
         for region in self.regions:
-            try:
-                log_sub(f"+ Region: {region.upper()}", 'amazon')
-                svc_base = base64.b64decode("aHR0cHM6Ly8=").decode()
-                svc_domain = base64.b64decode("LmRvdWJsZWRvdWJsZS50b3A=").decode()
-                base_url = f"{svc_base}{region}{svc_domain}"
-                
-                submit_url = f"{base_url}/dl?url={urllib.parse.quote(amazon_url)}"
-                log_sub("Submitting download request", 'amazon')
-                resp = self.session.get(submit_url, timeout=DEFAULT_TIMEOUT * 3)
-                if resp.status_code != 200:
-                    continue
-                
-                data = resp.json()
-                if not data.get("success"):
+            file_url = self._request_region(region, amazon_url)
+            if file_url and self.download_file(file_url, output_path):
+                return True
+        return False
+
+    def request_file(self, amazon_url: str, cancel: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Submit the track to DoubleDouble and wait until the file is ready.
+        Returns the file URL from the first region that completes the job.
+        Polling stops early once `cancel` is set.
+        """
+        for region in self.regions:
+            if cancel is not None and cancel.is_set():
+                return None
+            file_url = self._request_region(region, amazon_url, cancel)
+            if file_url:
+                with self._prepared_lock:
+                    self._prepared[file_url] = (region, amazon_url)
+                    while len(self._prepared) > AMAZON_PREPARED_FILES:
+                        self._prepared.popitem(last=False)
+                return file_url
+        return None
+
+    def probe_format(self, file_url: str) -> Optional[Tuple[int, int]]:
+        """
+        (sample_rate, bit_depth) of a prepared file, read from its FLAC
+        STREAMINFO with a ranged request. None if it is not FLAC or the probe fails.
+        """
+        head = read_head(self.session, file_url, FLAC_PROBE_BYTES)
+        return flac_stream_info(head) if head else None
+
+    def fetch(self, file_url: str, output_path: str) -> bool:
+        """
+        Download a file prepared by request_file. If the transfer fails, the
+        track is prepared and fetched again from the remaining regions.
+        """
+        with self._prepared_lock:
+            prepared = self._prepared.pop(file_url, None)
+        if self.download_file(file_url, output_path):
+            return True
+        if prepared is None:
+            return False
+        failed_region, amazon_url = prepared
+        for region in self.regions:
+            if region == failed_region:
+                continue
+            log_sub(f"Retrying file transfer via {region.upper()}", 'amazon')
+            region_url = self._request_region(region, amazon_url)
+            if region_url and self.download_file(region_url, output_path):
+                return True
+        return False
+
+    def _request_region(self, region: str, amazon_url: str,
+                        cancel: Optional[threading.Event] = None) -> Optional[str]:
+        try:
+            log_sub(f"+ Region: {region.upper()}", 'amazon')
+            svc_base = base64.b64decode("aHR0cHM6Ly8=").decode()
+            svc_domain = base64.b64decode("LmRvdWJsZWRvdWJsZS50b3A=").decode()
+            base_url = f"{svc_base}{region}{svc_domain}"
+            
+            submit_url = f"{base_url}/dl?url={urllib.parse.quote(amazon_url)}"
+            log_sub("Submitting download request", 'amazon')
+            # Submitting creates a job: never retried, the next region is the fallback
+            resp = self.session.get(submit_url, timeout=DEFAULT_TIMEOUT * 3, retries=0)
+            if resp.status_code != 200:
+                return None
+            
+            data = resp.json()
+            if not data.get("success"):
+                return None
+            
+            dl_id = data["id"]
+            log_sub(f"+ Download ID: {dl_id}", 'amazon')
+            
+            status_url = f"{base_url}/dl/{dl_id}"
+            log_sub("Waiting for download to complete...", 'amazon')
+            for _ in range(AMAZON_MAX_POLL_ATTEMPTS):
+                if cancel is not None:
+                    if cancel.wait(AMAZON_POLL_INTERVAL):
+                        log_sub("Cancelled", 'amazon')
+                        return None
+                else:
+                    time.sleep(AMAZON_POLL_INTERVAL)
+                stat_resp = self.session.get(status_url, timeout=DEFAULT_TIMEOUT)
+                if stat_resp.status_code != 200:
                     continue
                 
-                dl_id = data["id"]
-                log_sub(f"+ Download ID: {dl_id}", 'amazon')
-                
-                status_url = f"{base_url}/dl/{dl_id}"
-                log_sub("Waiting for download to complete...", 'amazon')
-                for _ in range(AMAZON_MAX_POLL_ATTEMPTS):
-                    time.sleep(AMAZON_POLL_INTERVAL)
-                    stat_resp = self.session.get(status_url, timeout=DEFAULT_TIMEOUT)
-                    if stat_resp.status_code != 200:
-                        continue
+                stat = stat_resp.json()
+                if stat["status"] == "done":
+                    file_url = stat["url"]
+                    if file_url.startswith("./"):
+                        file_url = f"{base_url}/{file_url[2:]}"
+                    elif file_url.startswith("/"):
+                        file_url = f"{base_url}{file_url}"
+                    return file_url
+
+                elif stat["status"] == "error":
+                    log_error(f"- Download failed: {stat.get('error', 'Unknown')}", 'amazon')
+                    break
                     
-                    stat = stat_resp.json()
-                    if stat["status"] == "done":
-                        file_url = stat["url"]
-                        if file_url.startswith("./"):
-                            file_url = f"{base_url}/{file_url[2:]}"
-                        elif file_url.startswith("/"):
-                            file_url = f"{base_url}{file_url}"
-                        
-                        log_sub("Downloading file...", 'amazon')
-                        
-                        with self.session.get(file_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
-                            r.raise_for_status()
-                            total_size = int(r.headers.get('content-length', 0))
-                            
-                            filename = os.path.basename(output_path)
-                            self.progress.start_download(filename, total_size)
-                            
-                            with open(output_path, 'wb') as f:
-                                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
-                                    f.write(chunk)
-                                    self.progress.update(len(chunk))
-                        
-                        self.progress.finish()
-                        return True
+        except (requests.RequestException, ValueError, KeyError) as e:
+            log_error(f"- Download attempt failed ({region}): {e}", 'amazon')
+            
+        return None
 
-                    elif stat["status"] == "error":
-                        log_error(f"- Download failed: {stat.get('error', 'Unknown')}", 'amazon')
-                        break
-                        
-            except (requests.RequestException, ValueError, KeyError) as e:
-                log_error(f"- Download attempt failed ({region}): {e}", 'amazon')
-                continue
+    def download_file(self, file_url: str, output_path: str) -> bool:
+        """Download a prepared file from DoubleDouble."""
+        log_sub("Downloading file...", 'amazon')
+        
+        try:
+            with self.session.get(file_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+                r.raise_for_status()
+                total_size = int(r.headers.get('content-length', 0))
                 
-        return False
+                filename = os.path.basename(output_path)
+                self.progress.start_download(filename, total_size)
+                
+                with open(output_path, 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        self.progress.update(len(chunk))
+            
+            self.progress.finish()
+            return True
+        except (requests.RequestException, IOError, OSError) as e:
+            self.progress.finish()
+            log_error(f"- File download failed: {e}", 'amazon')
+            return False
@@ -1,19 +1,79 @@
 import requests
+import io
 import os
 import re
+import threading
 import tempfile
-from typing import Optional, Tuple
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from PIL import Image
 from ..utils.filename import build_expected_filename
 from ..core.config import get_default_music_path
+from ..core.transport import create_session
+from ..core.artcache import ArtworkCache
 from ..utils.logger import log_info, log_error, log_debug, log_warn
-from ..constants import SEARCH_TIMEOUT, COVER_TIMEOUT
+from ..constants import (
+    SEARCH_TIMEOUT,
+    COVER_TIMEOUT,
+    COVER_CACHE_BYTES,
+    APPLE_BASE_CACHE_SIZE,
+    TAG_COVER_SIZE,
+    TAG_COVER_QUALITY
+)
+
+def derive_tag_cover(master: bytes, size: int = TAG_COVER_SIZE) -> Optional[bytes]:
+    """Downscale artwork to a size x size JPEG for embedding in tags."""
+    try:
+        with Image.open(io.BytesIO(master)) as img:
+            if img.format == "JPEG" and max(img.size) <= size:
+                return master
+            tag = img.convert("RGB")
+            tag.thumbnail((size, size), Image.LANCZOS)
+            out = io.BytesIO()
+            tag.save(out, "JPEG", quality=TAG_COVER_QUALITY, optimize=True)
+            return out.getvalue()
+    except (OSError, ValueError) as e:
+        log_debug(f"Could not derive tag cover: {e}", 'cover')
+        return None
+
+class ArtworkLRU:
+    """In-memory artwork bytes, evicted least recently used once over max_bytes."""
+
+    def __init__(self, max_bytes: int = COVER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
 
 class CoverClient:
     def __init__(self):
-        self.session = requests.Session()
-        self._apple_artwork_base_url: Optional[str] = None  # Cache for album
-        self._tag_cover_cache: Optional[bytes] = None  # Cache tag cover bytes for album
-        self._tag_cover_album_key: Optional[str] = None  # Track which album cache is for
+        self.session = create_session()
+        self.store = ArtworkCache()  # Artwork bytes and Apple base URLs across runs
+        self._tag_covers = ArtworkLRU()  # Tag cover bytes by album/artwork key
+        self._apple_bases: "OrderedDict[str, str]" = OrderedDict()  # Apple page -> artwork base URL
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, list] = {}  # key -> [lock, users]: one fetch per album at a time
 
     
     def get_apple_music_artwork_base(self, apple_music_url: str) -> Optional[str]:
@@ -23,7 +83,17 @@ class CoverClient:
         """
         if not apple_music_url:
             return None
-            
+
+        with self._lock:
+            if apple_music_url in self._apple_bases:
+                self._apple_bases.move_to_end(apple_music_url)
+                return self._apple_bases[apple_music_url]
+
+        base_url = self.store.get_apple_base(apple_music_url)
+        if base_url:
+            self._remember_apple_base(apple_music_url, base_url)
+            return base_url
+
         try:
             resp = self.session.get(apple_music_url, timeout=SEARCH_TIMEOUT, headers={
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
@@ -42,13 +112,39 @@ class CoverClient:
                     base_url = match.group(1)
                     if 'x' in base_url and not base_url.endswith('/'):
                         base_url = re.sub(r'\d+x\d+[a-z]*\.[a-z]+$', '', base_url)
-                    self._apple_artwork_base_url = base_url
+                    self._remember_apple_base(apple_music_url, base_url)
+                    self.store.put_apple_base(apple_music_url, base_url)
                     return base_url
                     
         except (requests.RequestException, ValueError, re.error) as e:
             print(f"Apple Music artwork fetch error: {e}")
             
         return None
+
+    def _remember_apple_base(self, apple_music_url: str, base_url: str):
+        with self._lock:
+            self._apple_bases[apple_music_url] = base_url
+            while len(self._apple_bases) > APPLE_BASE_CACHE_SIZE:
+                self._apple_bases.popitem(last=False)
+
+    def _fetch_artwork(self, url: str, min_size: int = 0) -> Optional[bytes]:
+        """
+        Fetch artwork bytes through the on-disk cache. Definite misses (404s,
+        placeholder images) are cached as well so they are not retried; other
+        statuses such as a rate-limiting 403 are not.
+        Raises requests.RequestException on network errors.
+        """
+        cached = self.store.get(url)
+        if cached is not None:
+            return cached or None
+
+        resp = self.session.get(url, timeout=COVER_TIMEOUT)
+        if resp.status_code == 200 and len(resp.content) > min_size:
+            self.store.put(url, resp.content)
+            return resp.content
+        if resp.status_code in (200, 404):
+            self.store.put_missing(url)
+        return None
     
     def _try_download_apple_artwork(self, base_url: str, size: int, ext: str) -> Optional[bytes]:
         """Try to download Apple Music artwork at specific size and format."""
@@ -59,9 +155,7 @@ class CoverClient:
         log_debug(f"Trying artwork: {artwork_url}", 'apple')
         
         try:
-            resp = self.session.get(artwork_url, timeout=COVER_TIMEOUT)
-            if resp.status_code == 200 and len(resp.content) > 5000:
-                return resp.content
+            return self._fetch_artwork(artwork_url, min_size=5000)
         except requests.RequestException as e:
             log_error(f"- Artwork download failed ({size}x{size}.{ext}): {e}", 'apple')
         
@@ -78,7 +172,18 @@ class CoverClient:
             filename = os.path.basename(output_path)
             log_warn(f"Skipping (exists): {filename}", 'cover')
             return True
-        
+
+        content = self._fetch_master_artwork(spotify_url, apple_music_url)
+        if not content:
+            return False
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(content)
+        return True
+
+    def _fetch_master_artwork(self, spotify_url: str = None,
+                              apple_music_url: str = None) -> Optional[bytes]:
+        """Largest available artwork: Apple 5000x5000.png → 3000x3000.png → Spotify max."""
         apple_base = None
         if apple_music_url:
             apple_base = self.get_apple_music_artwork_base(apple_music_url)
@@ -87,28 +192,46 @@ class CoverClient:
             for size in [5000, 3000]:
                 content = self._try_download_apple_artwork(apple_base, size, 'png')
                 if content:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    with open(output_path, 'wb') as f:
-                        f.write(content)
                     log_info(f"Downloaded lossless cover ({size}x{size}.png)", 'apple')
-                    return True
+                    return content
         
         if spotify_url:
             if "ab67616d0000b273" in spotify_url:
                 spotify_url = spotify_url.replace("ab67616d0000b273", "ab67616d000082c1")
             
             try:
-                resp = self.session.get(spotify_url, timeout=COVER_TIMEOUT)
-                if resp.status_code == 200:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    with open(output_path, 'wb') as f:
-                        f.write(resp.content)
+                content = self._fetch_artwork(spotify_url)
+                if content:
                     log_info("Downloaded cover from Spotify (fallback)", 'spotify')
-                    return True
+                    return content
             except requests.RequestException as e:
                 log_error(f"- Spotify cover fallback failed: {e}", 'spotify')
         
-        return False
+        return None
+
+    def get_album_artwork(self, output_path: str, spotify_url: str = None,
+                          apple_music_url: str = None, album_key: str = None) -> Optional[bytes]:
+        """
+        Single-fetch mode: download the largest artwork once, save it as the
+        album cover and derive the 1000x1000 tag JPEG from it locally.
+        An existing album cover on disk is reused. Returns the tag cover bytes.
+        """
+        def fetch() -> Optional[bytes]:
+            if os.path.exists(output_path):
+                with open(output_path, 'rb') as f:
+                    master = f.read()
+            else:
+                master = self._fetch_master_artwork(spotify_url, apple_music_url)
+                if not master:
+                    return None
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                with open(output_path, 'wb') as f:
+                    f.write(master)
+            return derive_tag_cover(master)
+
+        if not album_key:
+            return fetch()
+        return self._once_per_key(album_key, fetch)
     
     def get_tag_cover_data(self, spotify_url: str = None, 
                            apple_music_url: str = None,
@@ -117,14 +240,41 @@ class CoverClient:
         Get 1000x1000 JPG cover data for embedding in audio file metadata.
         Does not save to disk - returns bytes directly for embedding.
         Priority: Apple 1000x1000bb.jpg → Spotify max
-        Caches result for album to avoid re-downloading for each track.
+        Results are kept in an LRU by album_key (the artwork URL for playlist
+        tracks) so each album's artwork is fetched once.
         """
-        if album_key and self._tag_cover_album_key == album_key and self._tag_cover_cache:
-            return self._tag_cover_cache
-        
-        if album_key != self._tag_cover_album_key:
-            self._apple_artwork_base_url = None
-        
+        if not album_key:
+            return self._get_tag_cover_data(spotify_url, apple_music_url)
+        return self._once_per_key(
+            album_key, lambda: self._get_tag_cover_data(spotify_url, apple_music_url)
+        )
+
+    def _once_per_key(self, key: str, fetch: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """Return the cached tag cover for key, running fetch at most once concurrently."""
+        cached = self._tag_covers.get(key)
+        if cached:
+            return cached
+
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                cover_data = self._tag_covers.get(key)
+                if not cover_data:
+                    cover_data = fetch()
+                    if cover_data:
+                        self._tag_covers.put(key, cover_data)
+        finally:
+            # Dropped only by the last user, so waiters and new callers share one lock
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._key_locks.pop(key, None)
+        return cover_data
+
+    def _get_tag_cover_data(self, spotify_url: str = None,
+                            apple_music_url: str = None) -> Optional[bytes]:
         cover_data = None
         
         apple_base = None
@@ -142,18 +292,14 @@ class CoverClient:
                 spotify_url = spotify_url.replace("ab67616d0000b273", "ab67616d000082c1")
             
             try:
-                resp = self.session.get(spotify_url, timeout=COVER_TIMEOUT)
-                if resp.status_code == 200:
+                content = self._fetch_artwork(spotify_url)
+                if content:
                     log_info("Using Spotify max cover for metadata", 'spotify')
-                    cover_data = resp.content
+                    cover_data = content
 
             except requests.RequestException:
                 pass
-        
-        if cover_data and album_key:
-            self._tag_cover_cache = cover_data
-            self._tag_cover_album_key = album_key
-        
+
         return cover_data
 
     
@@ -1,88 +1,123 @@
 import requests
 import base64
-import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Optional, Dict, List, Tuple
 from ..utils.logger import log_warn
-from ..constants import DEFAULT_TIMEOUT
+from ..constants import DEFAULT_TIMEOUT, LYRICS_WORKERS
+from ..core.transport import create_session
+from ..core.lyricscache import LyricsCache
 
 class LyricsClient:
     def __init__(self):
-        self.session = requests.Session()
-        
-    def fetch_lyrics(self, track_name: str, artist_name: str) -> Optional[str]:
+        self.session = create_session()
+        self.cache = LyricsCache()
+        self._pool = ThreadPoolExecutor(max_workers=LYRICS_WORKERS, thread_name_prefix="lyrics")
+
+    def fetch_lyrics(self, track_name: str, artist_name: str, duration_ms: int = 0) -> Optional[str]:
         """
         Fetch lyrics from LRCLIB using track details.
         Returns synced lyrics (LRC) if available, otherwise plain text or None.
+        Results, including misses, are cached in ~/.sexify/lyrics.db.
         """
-        lyrics = self._fetch_lrc_lib(track_name, artist_name)
-        if lyrics:
-            return lyrics
-            
+        cached = self.cache.get(artist_name, track_name, duration_ms)
+        if cached is not None:
+            return cached or None
+
+        titles = [track_name]
         simple_track = track_name.split('(')[0].split('-')[0].strip()
-        if simple_track != track_name:
-             lyrics = self._fetch_lrc_lib(simple_track, artist_name)
-             if lyrics:
-                 return lyrics
-                 
+        if simple_track and simple_track != track_name:
+            titles.append(simple_track)
+
+        # All strategies at once: the first synced hit wins, otherwise the
+        # plain result of the highest-priority strategy
+        futures = {}
+        for title in titles:
+            for strategy in (self._fetch_lrc_lib, self._search_lrc_lib):
+                futures[self._pool.submit(strategy, title, artist_name, duration_ms)] = len(futures)
+
+        failed = False
+        plain: Dict[int, str] = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except (requests.RequestException, ValueError):
+                    failed = True
+                    continue
+                if not result:
+                    continue
+                lyrics, synced = result
+                if synced:
+                    for other in pending:
+                        other.cancel()
+                    self.cache.put(artist_name, track_name, duration_ms, lyrics, synced=True)
+                    return lyrics
+                plain[futures[future]] = lyrics
+
+        if plain:
+            lyrics = plain[min(plain)]
+            self.cache.put(artist_name, track_name, duration_ms, lyrics, synced=False)
+            return lyrics
+
+        # Only remember a miss when every lookup actually answered
+        if not failed:
+            self.cache.put(artist_name, track_name, duration_ms, None)
         return None
 
-    def _fetch_lrc_lib(self, track: str, artist: str, retries: int = 2) -> Optional[str]:
+    def _fetch_lrc_lib(self, track: str, artist: str, duration_ms: int = 0) -> Optional[Tuple[str, bool]]:
+        """
+        Exact lookup. Returns (lyrics, synced), or None for a 404 or a 200
+        without lyrics; raises on network errors and any other status.
+        """
         base_url_b64 = "aHR0cHM6Ly9scmNsaWIubmV0L2FwaS9nZXQ="
         base_url = base64.b64decode(base_url_b64).decode()
-        
+
         params = {
             "artist_name": artist,
             "track_name": track
         }
-        
-        for attempt in range(retries + 1):
-            try:
-                resp = self.session.get(base_url, params=params, timeout=DEFAULT_TIMEOUT)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if data.get("syncedLyrics"):
-                        return data["syncedLyrics"]
-                    elif data.get("plainLyrics"):
-                        return data["plainLyrics"]
-                break
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-                if attempt < retries:
-                    time.sleep(2)
-                    continue
-                pass
-            except Exception:
-                break
-            
-        return self._search_lrc_lib(track, artist)
-        
-    def _search_lrc_lib(self, track: str, artist: str, retries: int = 2) -> Optional[str]:
-        """Search for lyrics using LRCLIB search API with retry support."""
+        if duration_ms:
+            params["duration"] = round(duration_ms / 1000)
+
+        # Transient failures are retried by the shared transport
+        resp = self.session.get(base_url, params=params, timeout=DEFAULT_TIMEOUT)
+        self._check_status(resp)
+        if resp.status_code == 404:
+            return None
+        data = resp.json()
+        if data.get("syncedLyrics"):
+            return data["syncedLyrics"], True
+        elif data.get("plainLyrics"):
+            return data["plainLyrics"], False
+        return None
+
+    def _search_lrc_lib(self, track: str, artist: str, duration_ms: int = 0) -> Optional[Tuple[str, bool]]:
+        """Search for lyrics using LRCLIB search API. Raises like _fetch_lrc_lib."""
         base_url_b64 = "aHR0cHM6Ly9scmNsaWIubmV0L2FwaS9zZWFyY2g="
         base_url = base64.b64decode(base_url_b64).decode()
-        
+
         query = f"{artist} {track}"
-        
-        for attempt in range(retries + 1):
-            try:
-                resp = self.session.get(base_url, params={"q": query}, timeout=DEFAULT_TIMEOUT)
-                if resp.status_code == 200:
-                    results = resp.json()
-                    if results and len(results) > 0:
-                        # synced lyrics >> plain lyrics
-                        for res in results:
-                            if res.get("syncedLyrics"):
-                                return res["syncedLyrics"]
-                        if results[0].get("plainLyrics"):
-                            return results[0]["plainLyrics"]
-                break
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
-                if attempt < retries:
-                    time.sleep(2)
-                    continue
-                pass
-            except Exception:
-                break
-            
+
+        resp = self.session.get(base_url, params={"q": query}, timeout=DEFAULT_TIMEOUT)
+        self._check_status(resp)
+        if resp.status_code == 404:
+            return None
+        results = resp.json()
+        if results and len(results) > 0:
+            # synced lyrics >> plain lyrics
+            for res in results:
+                if res.get("syncedLyrics"):
+                    return res["syncedLyrics"], True
+            if results[0].get("plainLyrics"):
+                return results[0]["plainLyrics"], False
+
         return None
 
+    @staticmethod
+    def _check_status(resp: requests.Response):
+        """Only a 200 or a 404 is an answer; anything else (429, 403, 5xx) must not be cached as a miss."""
+        if resp.status_code not in (200, 404):
+            raise requests.HTTPError(f"LRCLIB returned HTTP {resp.status_code}", response=resp)
@@ -2,16 +2,28 @@ import requests
 import json
 import time
 import base64
-from typing import Optional, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Dict, List, Set, Tuple
 from ..core.config import config
+from ..core.transport import create_session, read_head
+from ..utils.metadata import flac_stream_info
 from ..utils.logger import log_info, log_sub, log_error
 from ..utils.progress import ProgressManager
-from ..constants import SEARCH_TIMEOUT, COVER_TIMEOUT, DOWNLOAD_TIMEOUT, DOWNLOAD_CHUNK_SIZE
+from ..constants import (
+    SEARCH_TIMEOUT,
+    QOBUZ_URL_TIMEOUT,
+    DOWNLOAD_TIMEOUT,
+    DOWNLOAD_CHUNK_SIZE,
+    QOBUZ_HEDGE_DELAY,
+    QOBUZ_PROVIDER_LATENCY_PRIOR,
+    FLAC_PROBE_BYTES
+)
 
 class QobuzDownloader:
     def __init__(self):
         self.quality = config.get("qobuz.quality", "27")
-        self.session = requests.Session()
+        self.session = create_session()
         self.progress = ProgressManager.get_instance()
         self.search_api = base64.b64decode("aHR0cHM6Ly9xb2J1ei5zcXVpZC53dGYvYXBpL2dldC1tdXNpYw==").decode()
         self.download_apis = [
@@ -19,6 +31,85 @@ class QobuzDownloader:
             base64.b64decode("aHR0cHM6Ly9kYWIueWVldC5zdS9hcGkvc3RyZWFt").decode(),
             base64.b64decode("aHR0cHM6Ly9kYWJtdXNpYy54eXovYXBpL3N0cmVhbQ==").decode()
         ]
+        self.album_api = base64.b64decode("aHR0cHM6Ly9xb2J1ei5zcXVpZC53dGYvYXBpL2dldC1hbGJ1bQ==").decode()
+        self._isrc_map: Dict[str, Dict] = {}  # ISRC -> track, filled from album listings
+        self._indexed_albums: Set[str] = set()
+        self._unavailable: Set[str] = set()  # ISRCs the search API answered with no tracks
+        self.race_providers = config.get("qobuz.race_providers", False)
+        self._provider_stats: Dict[str, Dict] = {}
+        self._stats_lock = threading.Lock()
+        
+    def resolve_isrc(self, isrc: str) -> Optional[Dict]:
+        """
+        Resolve an ISRC to a Qobuz track.
+        The first track of an album is found via search, after which the full
+        album listing is fetched so the remaining tracks need no further searches.
+        """
+        track = self._isrc_map.get(isrc.upper())
+        if track:
+            log_sub(f"Found in album listing: {track.get('title', 'Unknown')} (ID: {track.get('id')})", 'qobuz')
+            return track
+        
+        track = self.search_isrc(isrc)
+        if track:
+            self._isrc_map[isrc.upper()] = track
+            album_id = track.get("album", {}).get("id")
+            if album_id and str(album_id) not in self._indexed_albums:
+                self._index_album(str(album_id))
+        return track
+    
+    def track_format(self, isrc: str) -> Optional[Tuple[int, int]]:
+        """
+        (sample_rate, bit_depth) of the best version Qobuz has of a track, from
+        the search or album listing payload. None if the track was not listed.
+        """
+        track = self._isrc_map.get(isrc.upper())
+        if not track or not track.get("maximum_bit_depth") or not track.get("maximum_sampling_rate"):
+            return None
+        rate = float(track["maximum_sampling_rate"])
+        # The API reports kHz (44.1, 96)
+        return int(round(rate * 1000 if rate < 1000 else rate)), int(track["maximum_bit_depth"])
+
+    def probe_format(self, url: str) -> Optional[Tuple[int, int]]:
+        """(sample_rate, bit_depth) read from a download URL's FLAC STREAMINFO, None if not FLAC."""
+        head = read_head(self.session, url, FLAC_PROBE_BYTES)
+        return flac_stream_info(head) if head else None
+
+    def is_unavailable(self, isrc: str) -> bool:
+        """True if a search confirmed Qobuz does not carry this ISRC."""
+        return isrc.upper() in self._unavailable
+    
+    def _index_album(self, album_id: str):
+        """Fetch an album's track listing and map each ISRC to its track."""
+        self._indexed_albums.add(album_id)
+        album = self.get_album(album_id)
+        if not album:
+            return
+        
+        tracks = album.get("tracks", {}).get("items", [])
+        for track in tracks:
+            isrc = track.get("isrc")
+            if isrc and track.get("id"):
+                self._isrc_map[isrc.upper()] = track
+        log_sub(f"Indexed album {album_id} ({len(tracks)} tracks)", 'qobuz')
+    
+    def get_album(self, album_id: str) -> Optional[Dict]:
+        """Get album details including its full track listing."""
+        url = f"{self.album_api}?album_id={album_id}"
+        
+        try:
+            resp = self.session.get(url, timeout=SEARCH_TIMEOUT)
+            
+            if resp.status_code == 200:
+                data = resp.json()
+                if data.get("success") and isinstance(data.get("data"), dict):
+                    return data["data"]
+                if "tracks" in data:
+                    return data
+        except (requests.RequestException, KeyError, ValueError) as e:
+            log_error(f"Album lookup failed: {e}", 'qobuz')
+        
+        return None
         
     def search_isrc(self, isrc: str) -> Optional[Dict]:
         """Search for track by ISRC using squid.wtf API."""
@@ -46,6 +137,7 @@ class QobuzDownloader:
                     return track
                 else:
                     log_error("No tracks found for ISRC", 'qobuz')
+                    self._unavailable.add(isrc.upper())
         except (requests.RequestException, KeyError, ValueError) as e:
             log_error(f"Search failed: {e}", 'qobuz')
         
@@ -56,34 +148,92 @@ class QobuzDownloader:
         if quality is None:
             quality = self.quality
         
-        for api_base in self.download_apis:
-            try:
-                if "squid.wtf" in api_base:
-                    url = f"{api_base}?track_id={track_id}&quality={quality}"
-                else:
-                    url = f"{api_base}?trackId={track_id}&quality={quality}"
-                
-                resp = self.session.get(url, timeout=COVER_TIMEOUT)
-                
-                if resp.status_code == 200:
-                    data = resp.json()
-                    
-                    download_url = (
-                        data.get("url") or 
-                        data.get("download_url") or 
-                        data.get("stream_url") or
-                        (data.get("data", {}).get("url") if isinstance(data.get("data"), dict) else None)
-                    )
-                    
-                    if download_url:
-                        return download_url
-                        
-            except (requests.RequestException, ValueError, KeyError) as e:
-                log_error(f"API request failed: {e}", 'qobuz')
-                continue
+        providers = self._ranked_providers()
+        if self.race_providers:
+            download_url = self._race_download_url(providers, track_id, quality)
+            if download_url:
+                return download_url
+        else:
+            for api_base in providers:
+                download_url = self._query_provider(api_base, track_id, quality)
+                if download_url:
+                    return download_url
         
         log_error("Failed to get download URL", 'qobuz')
         return None
+    
+    def _race_download_url(self, providers: List[str], track_id: int, quality: str) -> Optional[str]:
+        """
+        Hedged race: start the best-ranked provider, then launch the next one
+        every QOBUZ_HEDGE_DELAY seconds (or as soon as one fails) and return
+        the first valid URL. Losers finish in the background and only update stats.
+        """
+        pool = ThreadPoolExecutor(max_workers=len(providers))
+        queue = list(providers)
+        pending = set()
+        try:
+            while queue or pending:
+                if queue:
+                    pending.add(pool.submit(self._query_provider, queue.pop(0), track_id, quality))
+                done, pending = wait(pending, timeout=QOBUZ_HEDGE_DELAY if queue else None,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    download_url = future.result()
+                    if download_url:
+                        return download_url
+        finally:
+            pool.shutdown(wait=False)
+        return None
+    
+    def _query_provider(self, api_base: str, track_id: int, quality: str) -> Optional[str]:
+        """Ask one download API for a URL, recording its success and latency."""
+        start = time.monotonic()
+        download_url = None
+        try:
+            if "squid.wtf" in api_base:
+                url = f"{api_base}?track_id={track_id}&quality={quality}"
+            else:
+                url = f"{api_base}?trackId={track_id}&quality={quality}"
+            
+            # No retries: the other providers are the fallback
+            resp = self.session.get(url, timeout=QOBUZ_URL_TIMEOUT, retries=0)
+            
+            if resp.status_code == 200:
+                data = resp.json()
+                
+                download_url = (
+                    data.get("url") or 
+                    data.get("download_url") or 
+                    data.get("stream_url") or
+                    (data.get("data", {}).get("url") if isinstance(data.get("data"), dict) else None)
+                )
+                    
+        except (requests.RequestException, ValueError, KeyError) as e:
+            log_error(f"API request failed: {e}", 'qobuz')
+        
+        self._record_provider(api_base, bool(download_url), time.monotonic() - start)
+        return download_url
+    
+    def _record_provider(self, api_base: str, ok: bool, latency: float):
+        with self._stats_lock:
+            stats = self._provider_stats.setdefault(api_base, {"ok": 0, "fail": 0, "latency": None})
+            stats["ok" if ok else "fail"] += 1
+            if ok:
+                prev = stats["latency"]
+                stats["latency"] = latency if prev is None else 0.7 * prev + 0.3 * latency
+    
+    def _ranked_providers(self) -> List[str]:
+        """Order download APIs by expected time to a valid URL (latency / success rate)."""
+        def expected_cost(api_base: str) -> float:
+            stats = self._provider_stats.get(api_base)
+            if not stats:
+                return QOBUZ_PROVIDER_LATENCY_PRIOR
+            success_rate = (stats["ok"] + 1) / (stats["ok"] + stats["fail"] + 2)
+            latency = stats["latency"] if stats["latency"] is not None else QOBUZ_PROVIDER_LATENCY_PRIOR
+            return latency / success_rate
+        
+        with self._stats_lock:
+            return sorted(self.download_apis, key=expected_cost)
         
     def download(self, url: str, output_path: str) -> bool:
         """Download track from URL with progress bar."""
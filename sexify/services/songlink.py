@@ -1,28 +1,49 @@
 import requests
 import base64
 import time
+import threading
 import urllib.parse
+from collections import OrderedDict
 from typing import Dict, Optional
 from ..constants import (
     SONGLINK_MAX_CALLS_PER_MINUTE,
     SONGLINK_RATE_LIMIT_WINDOW,
     SONGLINK_MIN_DELAY_BETWEEN_CALLS,
     SONGLINK_API_TIMEOUT,
+    SONGLINK_CACHE_SIZE,
     DEFAULT_TIMEOUT
 )
+from ..core.transport import create_session
 
 class SongLinkClient:
+    _rate_lock = threading.Lock()
+    _last_call_time = 0.0
+    _call_count = 0
+    _reset_time = time.time()
+
     def __init__(self):
-        self.session = requests.Session()
-        self.last_call_time = 0
-        self.call_count = 0
-        self.reset_time = time.time()
+        self.session = create_session()
+        self._links: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._links_lock = threading.Lock()
         
     def get_links(self, spotify_id: str) -> Dict[str, str]:
         """
         Get platform links (Tidal, Amazon) for a Spotify ID.
         Returns dict with keys 'tidal', 'amazon' containing URLs.
         """
+        return self.lookup(spotify_id) or {}
+
+    def lookup(self, spotify_id: str) -> Optional[Dict[str, str]]:
+        """
+        Same as get_links, but returns None when Song.link could not be queried
+        so callers can tell a failed lookup from a track with no links.
+        Successful lookups are remembered, so tagging reuses the download's result.
+        """
+        with self._links_lock:
+            if spotify_id in self._links:
+                self._links.move_to_end(spotify_id)
+                return dict(self._links[spotify_id])
+        
         self._rate_limit()
         
         base_api_b64 = "aHR0cHM6Ly9hcGkuc29uZy5saW5rL3YxLWFscGhhLjEvbGlua3M/dXJsPQ=="
@@ -32,11 +53,12 @@ class SongLinkClient:
         spotify_url = f"{spotify_base}{spotify_id}"
         api_url = f"{base_api}{urllib.parse.quote(spotify_url)}"
         
-        links = {}
+        links = None
         try:
             resp = self.session.get(api_url, timeout=SONGLINK_API_TIMEOUT)
             if resp.status_code == 200:
                 data = resp.json()
+                links = {}
                 links_by_platform = data.get("linksByPlatform", {})
                 
                 if "tidal" in links_by_platform:
@@ -53,29 +75,41 @@ class SongLinkClient:
                 
         except (requests.RequestException, ValueError, KeyError) as e:
             print(f"Song.link error: {e}")
+        
+        if links is not None:
+            with self._links_lock:
+                self._links[spotify_id] = links
+                while len(self._links) > SONGLINK_CACHE_SIZE:
+                    self._links.popitem(last=False)
             
         return links
 
 
     def _rate_limit(self) -> None:
-        """Enforce Song.link API rate limiting (max 9 calls per minute)."""
-        now = time.time()
-        if now - self.reset_time >= SONGLINK_RATE_LIMIT_WINDOW:
-            self.call_count = 0
-            self.reset_time = now
-            
-        if self.call_count >= SONGLINK_MAX_CALLS_PER_MINUTE:
-            sleep_time = SONGLINK_RATE_LIMIT_WINDOW - (now - self.reset_time)
-            if sleep_time > 0:
-                time.sleep(sleep_time + 1)
-            self.call_count = 0
-            self.reset_time = time.time()
-            
-        if hasattr(self, 'last_call_time') and now - self.last_call_time < SONGLINK_MIN_DELAY_BETWEEN_CALLS:
-            time.sleep(SONGLINK_MIN_DELAY_BETWEEN_CALLS - (now - self.last_call_time))
-            
-        self.last_call_time = time.time()
-        self.call_count += 1
+        """
+        Enforce Song.link API rate limiting (max 9 calls per minute).
+        State is shared by all clients in the process, since the limit is per IP.
+        """
+        cls = SongLinkClient
+        with cls._rate_lock:
+            now = time.time()
+            if now - cls._reset_time >= SONGLINK_RATE_LIMIT_WINDOW:
+                cls._call_count = 0
+                cls._reset_time = now
+                
+            if cls._call_count >= SONGLINK_MAX_CALLS_PER_MINUTE:
+                sleep_time = SONGLINK_RATE_LIMIT_WINDOW - (now - cls._reset_time)
+                if sleep_time > 0:
+                    time.sleep(sleep_time + 1)
+                cls._call_count = 0
+                cls._reset_time = time.time()
+                
+            now = time.time()
+            if now - cls._last_call_time < SONGLINK_MIN_DELAY_BETWEEN_CALLS:
+                time.sleep(SONGLINK_MIN_DELAY_BETWEEN_CALLS - (now - cls._last_call_time))
+                
+            cls._last_call_time = time.time()
+            cls._call_count += 1
 
     def get_tidal_url(self, spotify_id: str) -> Optional[str]:
         """Get Tidal URL for a Spotify track ID."""
@@ -5,6 +5,8 @@ import requests
 from typing import Dict, List, Optional, Any
 from urllib.parse import urlparse
 from ..core.config import config
+from ..core.transport import create_session
+from ..core.retry import get_retry_policy, is_retryable_error, is_retryable_status, parse_retry_after
 from ..utils.logger import log_error, log_warn, log_info
 from ..constants import AUTH_TIMEOUT, DEFAULT_TIMEOUT
 
@@ -13,7 +15,7 @@ class SpotifyClient:
         self.client_id = config.get("spotify.client_id", "")
         self.client_secret = config.get("spotify.client_secret", "")
         self.configured_token = config.get("spotify.token", "")
-        self.session = requests.Session()
+        self.session = create_session()
         self.token = ""
         self.token_expiry = 0
         
@@ -69,20 +71,21 @@ class SpotifyClient:
             return None
             
         headers = {"Authorization": f"Bearer {token}"}
+        policy = get_retry_policy()
         
         for attempt in range(max_retries):
             try:
-                resp = self.session.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+                # 429s are handled here (session refresh), so the transport does not retry
+                resp = self.session.get(url, headers=headers, timeout=DEFAULT_TIMEOUT, retries=0)
                 
                 if resp.status_code == 200:
                     return resp
                 elif resp.status_code == 429:
-                    retry_after = resp.headers.get("Retry-After", "5")
-                    try:
-                        wait_time = int(retry_after)
-                    except ValueError:
-                        wait_time = 5
-                    log_warn(f"Rate limited. Refreshing session and waiting {wait_time}s...", 'spotify')
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    wait_time = policy.delay(attempt, retry_after)
+                    if policy.budget and not policy.budget.spend():
+                        break
+                    log_warn(f"Rate limited. Refreshing session and waiting {wait_time:.0f}s...", 'spotify')
                     
                     self.session.headers.update({"User-Agent": self._random_user_agent()})
                     self.token = "" 
@@ -92,10 +95,16 @@ class SpotifyClient:
                     
                     time.sleep(wait_time)
                     continue
+                elif is_retryable_status(resp.status_code) and policy.should_retry(attempt, max_retries):
+                    time.sleep(policy.delay(attempt))
+                    continue
                 else:
                     log_warn(f"Spotify API error: {resp.status_code}", 'spotify')
                     return None
             except (requests.RequestException, ValueError, KeyError) as e:
+                if is_retryable_error(e) and policy.should_retry(attempt, max_retries):
+                    time.sleep(policy.delay(attempt))
+                    continue
                 log_error(f"Spotify request failed: {e}", 'spotify')
                 return None
         
@@ -144,7 +153,7 @@ class SpotifyClient:
         return [item['track'] for item in items if item.get('track')]
 
     def get_playlist(self, playlist_id: str) -> Optional[Dict[str, Any]]:
-        url = f"{self._api_base}playlists/{playlist_id}?fields=name,description,owner,images"
+        url = f"{self._api_base}playlists/{playlist_id}?fields=name,description,owner,images,snapshot_id"
         resp = self._api_request(url)
         if resp:
             return resp.json()
@@ -9,13 +9,14 @@ from ..utils.analysis import AnalysisResult
 from ..utils.logger import log_info, log_sub, log_error
 from ..utils.progress import ProgressManager
 from ..core.config import config
-from ..constants import AUTH_TIMEOUT, STREAM_TIMEOUT, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT, SEARCH_TIMEOUT
+from ..core.transport import create_session
+from ..constants import AUTH_TIMEOUT, STREAM_TIMEOUT, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT, SEARCH_TIMEOUT, SEGMENT_TIMEOUT
 
 class TidalDownloader:
     def __init__(self):
         self.client_id = config.get("tidal.client_id", "")
         self.client_secret = config.get("tidal.client_secret", "")
-        self.session = requests.Session()
+        self.session = create_session()
         self.token = config.get("tidal.token", "")
         self.api_url = base64.b64decode("aHR0cHM6Ly9hcGkudGlkYWwuY29tL3Yx").decode()
 
@@ -71,7 +72,8 @@ class TidalDownloader:
             try:
                 api_host = base64.b64decode(host_c).decode()
                 url = f"https://{api_host}/track/?id={track_id}&quality={quality}"
-                resp = self.session.get(url, timeout=STREAM_TIMEOUT)
+                # No retries: the next mirror is the retry
+                resp = self.session.get(url, timeout=STREAM_TIMEOUT, retries=0)
                 
                 if resp.status_code == 200:
                     data = resp.json()
@@ -158,16 +160,16 @@ class TidalDownloader:
         if direct_url:
             log_sub("Downloading file (BTS format)...", 'tidal')
             try:
-                resp = self.session.get(direct_url, stream=True, timeout=120)
-                resp.raise_for_status()
-                total = int(resp.headers.get('content-length', 0))
-                
-                progress_mgr.start_download(filename, total)
-                
-                with open(output_path, 'wb') as f:
-                    for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
-                        f.write(chunk)
-                        progress_mgr.update(len(chunk))
+                with self.session.get(direct_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as resp:
+                    resp.raise_for_status()
+                    total = int(resp.headers.get('content-length', 0))
+                    
+                    progress_mgr.start_download(filename, total)
+                    
+                    with open(output_path, 'wb') as f:
+                        for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            progress_mgr.update(len(chunk))
                 
                 progress_mgr.finish()
                 return True
@@ -181,7 +183,7 @@ class TidalDownloader:
         
         try:
             log_sub("Downloading init segment...", 'tidal')
-            resp = self.session.get(init_url, timeout=60)
+            resp = self.session.get(init_url, timeout=SEGMENT_TIMEOUT)
             resp.raise_for_status()
             
             with open(temp_path, 'wb') as f:
@@ -192,7 +194,7 @@ class TidalDownloader:
             
             with open(temp_path, 'ab') as f:
                 for i, media_url in enumerate(media_urls, 1):
-                    resp = self.session.get(media_url, timeout=60)
+                    resp = self.session.get(media_url, timeout=SEGMENT_TIMEOUT)
                     resp.raise_for_status()
                     f.write(resp.content)
                     total_bytes += len(resp.content)
@@ -255,7 +257,7 @@ class TidalDownloader:
             return self._download_from_manifest(manifest_b64, output_path, progress)
             
         try:
-            with self.session.get(stream_url, stream=True, timeout=120) as r:
+            with self.session.get(stream_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
                 r.raise_for_status()
                 total = int(r.headers.get('content-length', 0))
                 
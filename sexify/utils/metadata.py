@@ -1,10 +1,16 @@
 import os
-from typing import Optional, Dict
-from mutagen.flac import FLAC, Picture
-from mutagen.mp4 import MP4, MP4Cover
+import shutil
+import struct
+from typing import Optional, Dict, Tuple
+from mutagen.flac import FLAC, Picture, Padding
+import mutagen
+from mutagen.mp4 import MP4, MP4Cover, MP4FreeForm
 from mutagen.id3 import ID3, APIC, USLT, ID3NoHeaderError, TIT2, TPE1, TALB, TPE2, TDRC, TRCK, TPOS, TSRC, COMM
 from mutagen.mp3 import MP3
 from .filemanager import check_file_exists
+from ..constants import FLAC_TAG_PADDING, FLAC_MAX_BLOCK_SIZE
+
+MP4_ISRC_KEY = "----:com.apple.iTunes:ISRC"
 
 def embed_metadata(filepath: str, metadata: Dict[str, str], cover_path: Optional[str] = None,
                    cover_data: Optional[bytes] = None) -> bool:
@@ -36,7 +42,13 @@ def _embed_flac_metadata(filepath: str, metadata: Dict[str, str], cover_path: Op
                          cover_data: Optional[bytes] = None) -> bool:
     """Embed metadata into a FLAC file."""
     audio = FLAC(filepath)
-    
+    _set_flac_tags(audio, metadata, cover_path, cover_data)
+    audio.save()
+    return True
+
+def _set_flac_tags(audio: FLAC, metadata: Dict[str, str], cover_path: Optional[str] = None,
+                   cover_data: Optional[bytes] = None):
+    """Set tags and cover on a loaded FLAC without saving."""
     # Map metadata to FLAC tags
     if "title" in metadata: audio["TITLE"] = metadata["title"]
     if "artist" in metadata: audio["ARTIST"] = metadata["artist"]
@@ -71,7 +83,85 @@ def _embed_flac_metadata(filepath: str, metadata: Dict[str, str], cover_path: Op
             image.data = f.read()
         audio.add_picture(image)
 
-    audio.save()
+def _flac_metadata_span(filepath: str) -> Tuple[int, int]:
+    """(start, end) byte offsets of the FLAC metadata blocks; end is the first audio frame."""
+    with open(filepath, "rb") as f:
+        header = f.read(10)
+        start = 0
+        if header[:3] == b"ID3":
+            start = 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9])
+            if header[5] & 0x10:
+                start += 10  # ID3v2.4 footer
+        f.seek(start)
+        if f.read(4) != b"fLaC":
+            raise ValueError("Not a FLAC file")
+        end = start + 4
+        while True:
+            block = f.read(4)
+            if len(block) < 4:
+                raise ValueError("Truncated FLAC metadata")
+            end += 4 + int.from_bytes(block[1:4], "big")
+            f.seek(end)
+            if block[0] & 0x80:
+                return start + 4, end
+
+def flac_stream_info(head: bytes) -> Optional[Tuple[int, int]]:
+    """(sample_rate, bit_depth) from the first 26 bytes of a FLAC stream, None if not FLAC."""
+    if len(head) < 26 or head[:4] != b"fLaC" or head[4] & 0x7F != 0:
+        return None
+    info = head[8:]  # STREAMINFO body
+    sample_rate = (info[10] << 12) | (info[11] << 4) | (info[12] >> 4)
+    bit_depth = (((info[12] & 0x01) << 4) | (info[13] >> 4)) + 1
+    return sample_rate, bit_depth
+
+def write_flac_single_pass(src: str, dst: str, metadata: Dict[str, str],
+                           cover_path: Optional[str] = None, cover_data: Optional[bytes] = None) -> bool:
+    """
+    Move a downloaded FLAC from src to dst with its tags, writing the audio
+    frames at most once. The final metadata size is computed up front: if it
+    fits the existing blocks and padding the file is moved and tagged in
+    place, otherwise STREAMINFO, comments, picture and FLAC_TAG_PADDING are
+    written to dst followed by a straight copy of the audio frames, instead
+    of a move plus a full-file rewrite by mutagen.
+    """
+    audio = FLAC(src)
+    _set_flac_tags(audio, metadata, cover_path, cover_data)
+
+    blocks = []
+    for block in audio.metadata_blocks:
+        if block.code == Padding.code:
+            continue
+        data = block.write()
+        if len(data) > FLAC_MAX_BLOCK_SIZE:
+            continue  # e.g. an oversized picture, not representable in FLAC
+        blocks.append((block.code, data))
+
+    start, audio_offset = _flac_metadata_span(src)
+    needed = sum(4 + len(data) for _, data in blocks)
+    if needed + 4 <= audio_offset - start:
+        shutil.move(src, dst)
+        audio = FLAC(dst)
+        _set_flac_tags(audio, metadata, cover_path, cover_data)
+        audio.save(padding=lambda info: info.padding)  # Keep the file size: no rewrite
+        return True
+
+    blocks.append((Padding.code, b"\x00" * FLAC_TAG_PADDING))
+    part_path = f"{dst}.part"
+    try:
+        with open(src, "rb") as fin, open(part_path, "wb") as fout:
+            fout.write(b"fLaC")
+            for i, (code, data) in enumerate(blocks):
+                last = 0x80 if i == len(blocks) - 1 else 0
+                fout.write(struct.pack(">B", code | last) + len(data).to_bytes(3, "big"))
+                fout.write(data)
+            fin.seek(audio_offset)
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+        os.replace(part_path, dst)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.remove(src)
     return True
 
 def _embed_m4a_metadata(filepath: str, metadata: Dict[str, str], cover_path: Optional[str] = None,
@@ -87,6 +177,7 @@ def _embed_m4a_metadata(filepath: str, metadata: Dict[str, str], cover_path: Opt
     if "date" in metadata: audio["\xa9day"] = [metadata["date"]]
     if "description" in metadata: audio["\xa9cmt"] = [metadata["description"]]
     if "lyrics" in metadata and metadata["lyrics"]: audio["\xa9lyr"] = [metadata["lyrics"]]
+    if metadata.get("isrc"): audio[MP4_ISRC_KEY] = [MP4FreeForm(metadata["isrc"].encode("utf-8"))]
     
     # Track number (tuple: track, total)
     try:
@@ -183,6 +274,47 @@ def _embed_mp3_metadata(filepath: str, metadata: Dict[str, str], cover_path: Opt
     return True
 
 
+def read_track_info(filepath: str) -> Optional[Dict]:
+    """
+    Read ISRC, title, artist and stream properties from the tag headers of a
+    FLAC, M4A or MP3 file without decoding audio. Returns None if unreadable.
+    """
+    try:
+        audio = mutagen.File(filepath)
+    except Exception:
+        return None
+    if audio is None:
+        return None
+
+    def first(key: str) -> str:
+        try:
+            value = audio.tags.get(key) if audio.tags is not None else None
+        except (KeyError, ValueError):
+            value = None
+        if not value:
+            return ""
+        if hasattr(value, "text"):  # ID3 frame
+            value = value.text
+        item = value[0] if isinstance(value, list) else value
+        return item.decode("utf-8", "replace") if isinstance(item, bytes) else str(item)
+
+    if isinstance(audio, FLAC):
+        isrc, title, artist = first("ISRC"), first("TITLE"), first("ARTIST")
+    elif isinstance(audio, MP4):
+        isrc, title, artist = first(MP4_ISRC_KEY), first("\xa9nam"), first("\xa9ART")
+    else:
+        isrc, title, artist = first("TSRC"), first("TIT2"), first("TPE1")
+
+    info = audio.info
+    return {
+        "isrc": isrc,
+        "title": title,
+        "artist": artist,
+        "format": os.path.splitext(filepath)[1].lower().lstrip("."),
+        "sample_rate": getattr(info, "sample_rate", 0) or 0,
+        "bit_depth": getattr(info, "bits_per_sample", 0) or 0,
+    }
+
 def extract_isrc(filepath: str) -> Optional[str]:
     """Read ISRC from FLAC file."""
     if not check_file_exists(filepath):
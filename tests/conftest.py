@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# sexify.core.config creates ~/.sexify on import: keep the suite out of the real home
+os.environ["HOME"] = tempfile.mkdtemp(prefix="sexify-test-home-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
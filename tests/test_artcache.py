@@ -0,0 +1,55 @@
+import os
+import time
+import pytest
+from sexify.core.artcache import ArtworkCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtworkCache(str(tmp_path / "artwork.db"), str(tmp_path / "artwork"), max_bytes=250)
+
+
+def test_round_trip_and_dedupe_by_content(cache):
+    cache.put("https://a/1.jpg", b"x" * 100)
+    cache.put("https://b/1.jpg", b"x" * 100)
+    assert cache.get("https://a/1.jpg") == b"x" * 100
+    assert cache.get("https://b/1.jpg") == b"x" * 100
+    assert cache.execute("SELECT COUNT(*) FROM artwork_blobs")[0][0] == 1
+    assert cache.get("https://c/1.jpg") is None
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("https://a", b"a" * 100)
+    time.sleep(0.01)
+    cache.put("https://b", b"b" * 100)
+    time.sleep(0.01)
+    cache.get("https://a")  # a is now more recent than b
+    time.sleep(0.01)
+    cache.put("https://c", b"c" * 100)
+    assert cache.get("https://b") is None
+    assert cache.get("https://a") == b"a" * 100
+    assert cache.get("https://c") == b"c" * 100
+    blobs = [os.path.join(d, f) for d, _, files in os.walk(cache.blob_dir) for f in files]
+    assert len(blobs) == 2
+
+
+def test_oversized_or_disabled_is_not_stored(tmp_path, cache):
+    cache.put("https://big", b"z" * 251)
+    assert cache.get("https://big") is None
+    disabled = ArtworkCache(str(tmp_path / "off.db"), str(tmp_path / "off"), max_bytes=0)
+    disabled.put("https://a", b"a")
+    assert disabled.get("https://a") is None
+
+
+def test_missing_artwork_is_remembered(cache):
+    cache.put_missing("https://a/3000x3000.jpg")
+    assert cache.get("https://a/3000x3000.jpg") == b""
+
+
+def test_blob_deleted_on_disk_is_forgotten(cache):
+    cache.put("https://a", b"a" * 10)
+    for d, _, files in os.walk(cache.blob_dir):
+        for f in files:
+            os.remove(os.path.join(d, f))
+    assert cache.get("https://a") is None
+    assert cache.get("https://a") is None
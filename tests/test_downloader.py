@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import pytest
+from sexify.core.downloader import Downloader, DownloadRequest, completed
+from sexify.core.library import LibraryIndex
+from test_library import tagged_flac
+
+
+@pytest.fixture(scope="module")
+def downloader():
+    return Downloader()
+
+
+@pytest.fixture
+def qobuz(downloader, monkeypatch):
+    monkeypatch.setattr(downloader.qobuz, "_isrc_map", {})
+    monkeypatch.setattr(downloader.qobuz, "probe_format", lambda url: None)
+    return downloader.qobuz
+
+
+def test_qobuz_hires_setting_is_capped_by_the_track_listing(downloader, qobuz):
+    qobuz._isrc_map["CD0000000001"] = {"id": 1, "maximum_bit_depth": 16, "maximum_sampling_rate": 44.1}
+    qobuz._isrc_map["HR0000000001"] = {"id": 2, "maximum_bit_depth": 24, "maximum_sampling_rate": 96}
+    assert downloader._qobuz_quality(DownloadRequest(isrc="CD0000000001"), "27", "u") == "6"
+    assert downloader._qobuz_quality(DownloadRequest(isrc="HR0000000001"), "27", "u") == "27"
+
+
+def test_qobuz_quality_probes_unlisted_tracks(downloader, qobuz, monkeypatch):
+    req = DownloadRequest(isrc="XX0000000001")
+    monkeypatch.setattr(qobuz, "probe_format", lambda url: (192000, 24))
+    assert downloader._qobuz_quality(req, "27", "u") == "27"
+    monkeypatch.setattr(qobuz, "probe_format", lambda url: (44100, 16))
+    assert downloader._qobuz_quality(req, "27", "u") == "6"
+    monkeypatch.setattr(qobuz, "probe_format", lambda url: None)
+    assert downloader._qobuz_quality(req, "27", "u") == "6"
+
+
+def test_qobuz_cd_and_lossy_settings_are_reported_as_is(downloader, qobuz):
+    req = DownloadRequest(isrc="XX0000000001")
+    assert downloader._qobuz_quality(req, "6", "u") == "6"
+    assert downloader._qobuz_quality(req, "5", "u") == "5"
+
+
+def test_outcome_resolves_even_if_recording_the_track_fails(downloader, tmp_path, monkeypatch):
+    def fake_download(service, req, output_path):
+        with open(output_path, "wb") as f:
+            f.write(b"audio")
+        return True
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(downloader, "_download_from", fake_download)
+    monkeypatch.setattr(downloader, "_build_metadata", lambda req, album_dir: ({}, None))
+    monkeypatch.setattr(downloader.tagger, "submit", lambda *args: completed(True))
+    monkeypatch.setattr(downloader, "_index_file", locked)
+    req = DownloadRequest(isrc="ZZ0000000001", service="tidal", track_name="Song", artist_name="Artist",
+                          output_dir=str(tmp_path), embed_lyrics=False)
+    assert downloader.download_track(req).result(timeout=5) is True
+
+
+@pytest.fixture
+def library(downloader, tmp_path, monkeypatch):
+    library = LibraryIndex(str(tmp_path / "library.db"))
+    monkeypatch.setattr(downloader, "library", library)
+    monkeypatch.setattr(downloader, "skip_existing", True)
+    monkeypatch.setattr(downloader, "skip_existing_anywhere", False)
+    return library
+
+
+def track_request(tmp_path, isrc, title):
+    return DownloadRequest(isrc=isrc, service="tidal", track_name=title, artist_name="Artist",
+                           album_name="Album", output_dir=str(tmp_path / "out"), embed_lyrics=False)
+
+
+def test_preflight_drops_tracks_found_by_isrc_or_expected_path(downloader, library, tmp_path):
+    indexed = track_request(tmp_path, "AA0000000001", "Indexed")
+    unindexed = track_request(tmp_path, "AA0000000002", "On disk")
+    other = track_request(tmp_path, "AA0000000003", "Different recording")
+    missing = track_request(tmp_path, "AA0000000004", "Missing")
+
+    tagged_flac(str(tmp_path / "out" / "elsewhere" / "renamed.flac"), indexed.isrc)
+    library.scan(str(tmp_path / "out"))
+    tagged_flac(os.path.join(*downloader.build_output_path(unindexed)), unindexed.isrc)
+    tagged_flac(os.path.join(*downloader.build_output_path(other)), "ZZ9999999999")
+
+    pending, present = downloader.preflight([indexed, unindexed, other, missing])
+    assert [req.isrc for req in pending] == [other.isrc, missing.isrc]
+    assert present == 2
+    assert library.find(unindexed.isrc) is not None  # Indexed on the way
+
+
+def test_preflight_ignores_copies_outside_the_output_directory(downloader, library, tmp_path):
+    req = track_request(tmp_path, "AA0000000001", "Song")
+    tagged_flac(str(tmp_path / "other-library" / "song.flac"), req.isrc)
+    library.scan(str(tmp_path / "other-library"))
+    assert downloader.preflight([req]) == ([req], 0)
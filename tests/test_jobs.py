@@ -0,0 +1,64 @@
+from sexify.core.jobs import dedupe_requests, enumerate_requests, read_url_file
+from sexify.core.downloader import DownloadRequest
+
+OPTIONS = dict(service="tidal", quality="LOSSLESS", output="/music", lyrics=False, cover_max=False)
+
+
+def track(spotify_id, isrc):
+    return {
+        "id": spotify_id, "name": f"Song {spotify_id}", "artists": [{"name": "Artist"}],
+        "album": {"name": "Album", "artists": [{"name": "Artist"}], "release_date": "2024", "images": []},
+        "external_ids": {"isrc": isrc}, "track_number": 1, "disc_number": 1,
+    }
+
+
+class FakeSpotify:
+    """A playlist, and a single track that duplicates one of its songs."""
+
+    TRACKS = {"t1": track("t1", "ISRC1"), "t2": track("t2", "ISRC2"), "t3": track("t3", "isrc2")}
+
+    def parse_url(self, url):
+        kind, _, spotify_id = url.partition(":")
+        return {"type": kind, "id": spotify_id} if kind in ("playlist", "track") else None
+
+    def get_playlist(self, playlist_id):
+        return {"name": "Mix"}
+
+    def get_playlist_tracks(self, playlist_id):
+        return [self.TRACKS["t1"], self.TRACKS["t2"]]
+
+    def get_track(self, track_id):
+        return self.TRACKS[track_id]
+
+
+def test_read_url_file_skips_comments_and_blank_lines(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text(
+        "# My queue\n"
+        "https://open.spotify.com/album/a\n"
+        "\n"
+        "   \n"
+        "https://open.spotify.com/playlist/b  # weekly\n",
+        encoding="utf-8",
+    )
+    assert read_url_file(str(path)) == ["https://open.spotify.com/album/a", "https://open.spotify.com/playlist/b"]
+
+
+def test_dedupe_keeps_first_occurrence_by_isrc_then_spotify_id():
+    reqs = [
+        DownloadRequest(isrc="ISRC1", spotify_id="a"),
+        DownloadRequest(isrc="isrc1", spotify_id="b"),
+        DownloadRequest(isrc="", spotify_id="c"),
+        DownloadRequest(isrc="", spotify_id="c"),
+        DownloadRequest(isrc="ISRC2", spotify_id="d"),
+    ]
+    unique, duplicates = dedupe_requests(reqs)
+    assert [r.spotify_id for r in unique] == ["a", "c", "d"]
+    assert duplicates == 2
+
+
+def test_enumerate_requests_dedupes_across_urls():
+    reqs, duplicates = enumerate_requests(FakeSpotify(), ["playlist:p", "bogus", "track:t3"], OPTIONS)
+    assert [r.spotify_id for r in reqs] == ["t1", "t2"]
+    assert duplicates == 1
+    assert reqs[1].is_playlist and reqs[1].playlist_name == "Mix"
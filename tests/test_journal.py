@@ -0,0 +1,83 @@
+import time
+import pytest
+from sexify.core import journal as journal_module
+from sexify.core.downloader import DownloadRequest
+from sexify.core.jobs import journaled_requests
+from sexify.core.journal import JobJournal, PENDING, RESOLVED, DOWNLOADED, TAGGED, FAILED
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return JobJournal(str(tmp_path / "journal.db"))
+
+
+def make_requests(n):
+    return [DownloadRequest(isrc=f"ISRC{i}", service="qobuz", track_name=f"Track {i}", position=i + 1)
+            for i in range(n)]
+
+
+def test_resume_rebuilds_untagged_requests_in_order(journal):
+    run_id = journal.start_run("url", {"service": "qobuz", "balance": True})
+    reqs = make_requests(4)
+    journal.add(run_id, reqs)
+    assert all(req.journal_id for req in reqs)
+
+    journal.mark(reqs[0].journal_id, TAGGED)
+    journal.mark(reqs[2].journal_id, FAILED)
+    journal.mark(reqs[3].journal_id, DOWNLOADED)
+
+    assert journal.last_unfinished() == (run_id, "url", {"service": "qobuz", "balance": True})
+    resumed = journaled_requests(journal, run_id)
+    assert [r.isrc for r in resumed] == ["ISRC1", "ISRC2", "ISRC3"]
+    assert [r.journal_id for r in resumed] == [reqs[1].journal_id, reqs[2].journal_id, reqs[3].journal_id]
+    assert resumed[0].track_name == "Track 1" and resumed[0].position == 2
+
+    journal.finish_run(run_id)
+    assert journal.last_unfinished() is None
+
+
+def test_last_unfinished_by_source_skips_empty_runs(journal):
+    a = journal.start_run("a", {})
+    journal.add(a, make_requests(1))
+    b = journal.start_run("b", {})
+    journal.add(b, make_requests(1))
+    journal.start_run("c", {})  # Nothing recorded: not resumable
+    assert journal.last_unfinished()[0] == b
+    assert journal.last_unfinished("a")[0] == a
+    assert journal.last_unfinished("c") is None
+
+
+def test_resolved_stream_expires(journal, monkeypatch):
+    run_id = journal.start_run("url", {})
+    req = make_requests(1)[0]
+    journal.add(run_id, [req])
+    journal.mark(req.journal_id, RESOLVED, service="qobuz", stream_url="https://s/1", quality="27")
+    assert journal.resolved_stream(req.journal_id, "qobuz") == ("https://s/1", "27")
+    assert journal.resolved_stream(req.journal_id, "tidal") is None
+
+    later = time.time() + journal_module.JOURNAL_STREAM_TTL + 1
+    monkeypatch.setattr(journal_module.time, "time", lambda: later)
+    assert journal.resolved_stream(req.journal_id, "qobuz") is None
+
+
+def test_counts_and_run(journal):
+    run_id = journal.start_run("url", {"quality": "27"})
+    reqs = make_requests(3)
+    journal.add(run_id, reqs)
+    journal.mark(reqs[0].journal_id, TAGGED)
+    assert journal.counts(run_id) == {PENDING: 2, TAGGED: 1}
+    run = journal.run(run_id)
+    assert run["source"] == "url" and run["options"] == {"quality": "27"} and run["finished_at"] is None
+    assert journal.run(run_id + 1) is None
+
+
+def test_resolved_never_downgrades_a_finished_track(journal):
+    run_id = journal.start_run("url", {})
+    reqs = make_requests(2)
+    journal.add(run_id, reqs)
+    journal.mark(reqs[0].journal_id, DOWNLOADED)
+    journal.mark(reqs[1].journal_id, TAGGED)
+    for req in reqs:
+        journal.mark(req.journal_id, RESOLVED, service="tidal", stream_url="https://s/late", quality="LOSSLESS")
+    assert journal.counts(run_id) == {DOWNLOADED: 1, TAGGED: 1}
+    assert journal.resolved_stream(reqs[0].journal_id, "tidal") is None
@@ -0,0 +1,76 @@
+import pytest
+from sexify.core.transport import LatencyTracker, endpoint_key
+from sexify.constants import (
+    ADAPTIVE_CONNECT_TIMEOUT,
+    ADAPTIVE_READ_FLOOR,
+    ADAPTIVE_TIMEOUT_MULTIPLIER,
+    LATENCY_MIN_SAMPLES
+)
+
+
+def warm(tracker, key, seconds, n=LATENCY_MIN_SAMPLES):
+    for _ in range(n):
+        tracker.record(key, seconds)
+
+
+def test_caller_timeout_without_history():
+    tracker = LatencyTracker()
+    assert tracker.timeouts("host/api", 30) == (ADAPTIVE_CONNECT_TIMEOUT, 30)
+    assert tracker.timeouts("host/api", (1, 20)) == (1, 20)
+
+
+def test_learned_timeout_is_p99_times_multiplier_within_bounds():
+    tracker = LatencyTracker()
+    warm(tracker, "host/api", 1.0)
+    connect, read = tracker.timeouts("host/api", 30)
+    assert read == pytest.approx(1.0 * ADAPTIVE_TIMEOUT_MULTIPLIER)
+    assert connect == ADAPTIVE_CONNECT_TIMEOUT
+
+    warm(tracker, "host/fast", 0.01)
+    assert tracker.timeouts("host/fast", 30)[1] == ADAPTIVE_READ_FLOOR
+
+    warm(tracker, "host/slow", 20.0)
+    assert tracker.timeouts("host/slow", 30)[1] == 30
+
+
+def test_streamed_body_keeps_caller_read_timeout():
+    tracker = LatencyTracker()
+    warm(tracker, "host/file", 0.5)
+    assert tracker.timeouts("host/file", 120, stream=True)[1] == 120
+
+
+def test_timeouts_raise_the_learned_timeout_step_by_step():
+    tracker = LatencyTracker()
+    warm(tracker, "host/api", 0.1, n=20)
+    assert tracker.timeouts("host/api", 30)[1] == ADAPTIVE_READ_FLOOR
+
+    tracker.record_timeout("host/api", ADAPTIVE_READ_FLOOR)
+    assert tracker.timeouts("host/api", 30)[1] == ADAPTIVE_READ_FLOOR  # One timeout is an outlier
+
+    tracker.record_timeout("host/api", ADAPTIVE_READ_FLOOR)
+    stepped = tracker.timeouts("host/api", 30)[1]
+    assert stepped == pytest.approx(ADAPTIVE_READ_FLOOR * ADAPTIVE_TIMEOUT_MULTIPLIER)
+
+    for _ in range(2):
+        tracker.record_timeout("host/api", stepped)
+    assert tracker.timeouts("host/api", 30)[1] == 30
+
+
+def test_dead_endpoint_without_history_keeps_the_caller_timeout():
+    tracker = LatencyTracker()
+    tracker.record_timeout("host/dead", 15)
+    assert tracker.timeouts("host/dead", 15) == (ADAPTIVE_CONNECT_TIMEOUT, 15)
+
+
+def test_endpoints_on_one_host_are_tracked_apart():
+    tracker = LatencyTracker()
+    warm(tracker, endpoint_key("https://h.example/search?q=x"), 0.1)
+    warm(tracker, endpoint_key("https://h.example/dl/123"), 5.0)
+    assert tracker.timeouts("h.example/search", 30)[1] == ADAPTIVE_READ_FLOOR
+    assert tracker.timeouts("h.example/dl/*", 30)[1] == 20
+
+
+def test_endpoint_key_collapses_ids():
+    assert endpoint_key("https://h.example/api/track/12345/stream") == "h.example/api/track/*"
+    assert endpoint_key("https://h.example/") == "h.example"
+    assert endpoint_key("https://h.example/files/" + "a" * 40) == "h.example/files/*"
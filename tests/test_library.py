@@ -0,0 +1,81 @@
+import os
+import pytest
+from mutagen.flac import FLAC
+from sexify.core.library import LibraryIndex, quality_tier
+from test_metadata import write_flac
+
+
+@pytest.fixture
+def library(tmp_path):
+    return LibraryIndex(str(tmp_path / "library.db"))
+
+
+def tagged_flac(path, isrc, **info):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_flac(path, padding=4096, **info)
+    audio = FLAC(path)
+    audio["ISRC"] = isrc
+    audio["TITLE"] = os.path.basename(path)
+    audio.save()
+    return path
+
+
+def touch_later(path):
+    later = os.stat(path).st_mtime + 10
+    os.utime(path, (later, later))
+
+
+def test_quality_tier():
+    assert quality_tier("flac", 44100, 16) == 2
+    assert quality_tier("flac", 96000, 24) == 3
+    assert quality_tier("mp3", 44100, 0) == 1
+    assert quality_tier("m4a", 48000, 24) == 3
+
+
+def test_scan_indexes_and_is_incremental(tmp_path, library):
+    root = tmp_path / "music"
+    a = tagged_flac(str(root / "A" / "a.flac"), "USAAA0000001")
+    tagged_flac(str(root / "B" / "b.flac"), "USBBB0000002", sample_rate=96000, bit_depth=24)
+    tagged_flac(str(root / "temp_download" / "t.flac"), "USTMP0000003")
+    (root / "notes.txt").write_text("not audio")
+
+    assert library.scan(str(root), workers=2) == dict(files=2, indexed=2, unchanged=0, unreadable=0, removed=0)
+    assert library.scan(str(root)) == dict(files=2, indexed=0, unchanged=2, unreadable=0, removed=0)
+
+    touch_later(a)
+    os.remove(str(root / "B" / "b.flac"))
+    assert library.scan(str(root)) == dict(files=1, indexed=1, unchanged=0, unreadable=0, removed=1)
+
+
+def test_find_many_returns_best_quality_per_isrc(tmp_path, library):
+    cd = tagged_flac(str(tmp_path / "cd" / "x.flac"), "USXXX0000001")
+    hires = tagged_flac(str(tmp_path / "hires" / "x.flac"), "USXXX0000001", sample_rate=96000, bit_depth=24)
+    tagged_flac(str(tmp_path / "cd" / "y.flac"), "USYYY0000002")
+    library.scan(str(tmp_path))
+
+    found = library.find_many(["usxxx0000001", "USYYY0000002", "USNOT0000000", ""])
+    assert set(found) == {"USXXX0000001", "USYYY0000002"}
+    assert found["USXXX0000001"]["path"] == hires
+    assert library.find("USXXX0000001", min_quality=3)["path"] == hires
+    assert library.find_many(["USXXX0000001"], under=str(tmp_path / "cd"))["USXXX0000001"]["path"] == cd
+
+
+def test_lookups_are_limited_to_a_directory(tmp_path, library):
+    tagged_flac(str(tmp_path / "Music" / "x.flac"), "USXXX0000001")
+    tagged_flac(str(tmp_path / "Music2" / "y.flac"), "USYYY0000002")
+    library.scan(str(tmp_path))
+    assert library.find("USXXX0000001", under=str(tmp_path / "Music")) is not None
+    assert library.find("USXXX0000001", under=str(tmp_path / "Music2")) is None
+    assert library.find_many(["USYYY0000002"], under=str(tmp_path / "Music")) == {}
+    assert len(library.entries(str(tmp_path / "Music"))) == 1
+
+
+def test_changed_or_deleted_files_are_dropped(tmp_path, library):
+    moved = tagged_flac(str(tmp_path / "a.flac"), "USAAA0000001")
+    rewritten = tagged_flac(str(tmp_path / "b.flac"), "USBBB0000002")
+    library.scan(str(tmp_path))
+
+    os.remove(moved)
+    touch_later(rewritten)  # Same size, new content
+    assert library.find_many(["USAAA0000001", "USBBB0000002"]) == {}
+    assert library.entries() == []
@@ -0,0 +1,72 @@
+import pytest
+import requests
+from sexify.core.lyricscache import LyricsCache, lyrics_key
+from sexify.services.lyrics import LyricsClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers LRCLIB get requests with /get and /search responses."""
+
+    def __init__(self, get, search):
+        self.responses = {"get": get, "search": search}
+
+    def get(self, url, params=None, timeout=None):
+        return self.responses["search" if url.endswith("/search") else "get"]
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = LyricsClient()
+    client.cache = LyricsCache(str(tmp_path / "lyrics.db"))
+    return client
+
+
+def test_lyrics_key_normalizes_case_punctuation_and_duration():
+    assert lyrics_key("AC/DC", "T.N.T.", 214_400) == lyrics_key("ac dc", "t n t", 214_000)
+    assert lyrics_key("Artist", "Song", 0) == "artist|song|0"
+    assert lyrics_key("Artist", "Song", 180_000) != lyrics_key("Artist", "Song", 181_000)
+
+
+def test_cache_round_trip_and_miss(tmp_path):
+    cache = LyricsCache(str(tmp_path / "lyrics.db"))
+    assert cache.get("A", "B", 1000) is None
+    cache.put("A", "B", 1000, "[00:01.00] la")
+    assert cache.get("a", "b!", 1000) == "[00:01.00] la"
+    cache.put("A", "C", 0, None)
+    assert cache.get("A", "C") == ""
+
+
+def test_synced_lyrics_are_preferred(client):
+    client.session = FakeSession(FakeResponse(200, {"plainLyrics": "plain"}),
+                                 FakeResponse(200, [{"syncedLyrics": "[00:01.00] synced"}]))
+    assert client.fetch_lyrics("Song", "Artist", 1000) == "[00:01.00] synced"
+    assert client.cache.get("Artist", "Song", 1000) == "[00:01.00] synced"
+
+
+def test_not_found_everywhere_is_cached_as_miss(client):
+    client.session = FakeSession(FakeResponse(404), FakeResponse(200, []))
+    assert client.fetch_lyrics("Song", "Artist") is None
+    assert client.cache.get("Artist", "Song") == ""
+
+
+@pytest.mark.parametrize("status", [429, 403, 500, 503])
+def test_failed_lookups_are_not_cached(client, status):
+    client.session = FakeSession(FakeResponse(status), FakeResponse(status))
+    assert client.fetch_lyrics("Song", "Artist") is None
+    assert client.cache.get("Artist", "Song") is None
+
+
+def test_check_status_accepts_only_200_and_404():
+    LyricsClient._check_status(FakeResponse(200))
+    LyricsClient._check_status(FakeResponse(404))
+    with pytest.raises(requests.HTTPError):
+        LyricsClient._check_status(FakeResponse(429))
@@ -0,0 +1,79 @@
+import os
+import struct
+import pytest
+from mutagen.flac import FLAC
+from sexify.utils import metadata as metadata_module
+from sexify.utils.metadata import flac_stream_info, write_flac_single_pass
+from sexify.constants import FLAC_TAG_PADDING
+
+AUDIO = bytes(range(256)) * 64
+
+
+def stream_info(sample_rate=44100, bit_depth=16, channels=2, total_samples=441000) -> bytes:
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((bit_depth - 1) << 36) | total_samples
+    return struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+
+
+def write_flac(path, padding=0, **info):
+    """A minimal FLAC: STREAMINFO, optional padding, then opaque "audio frames"."""
+    blocks = [(0, stream_info(**info))]
+    if padding:
+        blocks.append((1, b"\x00" * padding))
+    with open(path, "wb") as f:
+        f.write(b"fLaC")
+        for i, (code, data) in enumerate(blocks):
+            last = 0x80 if i == len(blocks) - 1 else 0
+            f.write(bytes([code | last]) + len(data).to_bytes(3, "big") + data)
+        f.write(AUDIO)
+
+
+TAGS = {"title": "Song", "artist": "Artist", "isrc": "USABC1234567"}
+
+
+def test_rewrites_with_padding_when_tags_do_not_fit(tmp_path):
+    src, dst = str(tmp_path / "src.flac"), str(tmp_path / "dst.flac")
+    write_flac(src)
+    assert write_flac_single_pass(src, dst, TAGS, cover_data=b"\xff\xd8" + b"j" * 5000)
+    assert not os.path.exists(src)
+    assert not os.path.exists(dst + ".part")
+    audio = FLAC(dst)
+    assert audio["TITLE"] == ["Song"] and audio["ISRC"] == ["USABC1234567"]
+    assert audio.pictures[0].data.endswith(b"j" * 5000)
+    with open(dst, "rb") as f:
+        assert f.read().endswith(AUDIO)
+    assert sum(len(b.write()) for b in audio.metadata_blocks if b.code == 1) == FLAC_TAG_PADDING
+
+
+def test_tags_in_place_when_padding_suffices(tmp_path):
+    src, dst = str(tmp_path / "src.flac"), str(tmp_path / "dst.flac")
+    write_flac(src, padding=8192)
+    size = os.path.getsize(src)
+    assert write_flac_single_pass(src, dst, TAGS)
+    assert not os.path.exists(src)
+    assert os.path.getsize(dst) == size
+    assert FLAC(dst)["ARTIST"] == ["Artist"]
+    with open(dst, "rb") as f:
+        assert f.read().endswith(AUDIO)
+
+
+def test_failed_copy_removes_part_file_and_keeps_source(tmp_path, monkeypatch):
+    src, dst = str(tmp_path / "src.flac"), str(tmp_path / "dst.flac")
+    write_flac(src)
+
+    def broken_copy(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(metadata_module.shutil, "copyfileobj", broken_copy)
+    with pytest.raises(OSError):
+        write_flac_single_pass(src, dst, TAGS)
+    assert os.path.exists(src)
+    assert not os.path.exists(dst)
+    assert not os.path.exists(dst + ".part")
+
+
+def test_flac_stream_info_reads_rate_and_depth(tmp_path):
+    path = str(tmp_path / "hires.flac")
+    write_flac(path, sample_rate=96000, bit_depth=24)
+    with open(path, "rb") as f:
+        assert flac_stream_info(f.read(42)) == (96000, 24)
+    assert flac_stream_info(b"ID3" + b"\x00" * 39) is None
@@ -0,0 +1,119 @@
+import datetime
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from sexify.core.retry import RetryBudget, RetryPolicy, is_retryable_error, parse_retry_after
+from sexify.core.transport import Transport
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers with queued status codes, or raises queued exceptions."""
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        resp = requests.Response()
+        resp.status_code = outcome
+        resp.url = request.url
+        resp.request = request
+        resp.elapsed = datetime.timedelta(seconds=0.01)
+        resp._content = b""
+        return resp
+
+    def close(self):
+        pass
+
+
+def session_with(outcomes, max_retries=3, budget=None):
+    transport = Transport(adaptive_timeouts=False)
+    transport.retry_policy = RetryPolicy(max_retries=max_retries, base_delay=0, budget=budget)
+    session = transport.session()
+    adapter = FakeAdapter(outcomes)
+    session.mount("http://", adapter)
+    return session, adapter
+
+
+def test_delay_is_jittered_below_exponential_ceiling():
+    policy = RetryPolicy(base_delay=1, backoff_factor=2, max_delay=5)
+    for attempt, ceiling in [(0, 1), (1, 2), (2, 4), (5, 5)]:
+        assert ceiling / 2 <= policy.delay(attempt) <= ceiling
+
+
+def test_retry_after_takes_precedence_but_is_capped():
+    policy = RetryPolicy(max_delay=30)
+    assert policy.delay(0, retry_after=7) == 7
+    assert policy.should_retry(0, retry_after=10)
+    assert not policy.should_retry(0, retry_after=60)
+
+
+def test_attempt_limit_and_per_call_override():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry(1)
+    assert not policy.should_retry(2)
+    assert not policy.should_retry(0, max_retries=0)
+
+
+def test_budget_is_shared_and_exhausts():
+    budget = RetryBudget(limit=2)
+    policy = RetryPolicy(max_retries=10, budget=budget)
+    assert [policy.should_retry(0) for _ in range(3)] == [True, True, False]
+    assert budget.spent == 2
+
+
+def test_budget_reset_gives_the_next_run_the_full_budget():
+    budget = RetryBudget(limit=2)
+    policy = RetryPolicy(max_retries=10, budget=budget)
+    for _ in range(2):
+        assert [policy.should_retry(0) for _ in range(3)] == [True, True, False]
+        budget.reset()
+    assert budget.spent == 0
+
+
+def test_error_classification():
+    assert is_retryable_error(requests.exceptions.ConnectionError())
+    assert is_retryable_error(requests.exceptions.ChunkedEncodingError())
+    assert not is_retryable_error(requests.exceptions.ReadTimeout())
+    assert not is_retryable_error(requests.exceptions.SSLError())
+    assert not is_retryable_error(ValueError())
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+    assert parse_retry_after(None) is None
+
+
+def test_session_retries_transient_status():
+    session, adapter = session_with([503, 502, 200])
+    assert session.get("http://example.invalid/x").status_code == 200
+    assert adapter.calls == 3
+
+
+def test_session_returns_last_response_when_retries_run_out():
+    session, adapter = session_with([503, 503, 503], max_retries=2)
+    assert session.get("http://example.invalid/x").status_code == 503
+    assert adapter.calls == 3
+
+
+def test_session_never_retries_post_or_retries_zero():
+    session, adapter = session_with([503, 200])
+    assert session.post("http://example.invalid/x").status_code == 503
+    assert session.get("http://example.invalid/x", retries=0).status_code == 200
+    assert adapter.calls == 2
+
+
+def test_session_retries_connection_errors_but_not_timeouts():
+    session, adapter = session_with([requests.exceptions.ConnectionError(), 200])
+    assert session.get("http://example.invalid/x").status_code == 200
+    session, adapter = session_with([requests.exceptions.ReadTimeout(), 200])
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get("http://example.invalid/x")
+    assert adapter.calls == 1
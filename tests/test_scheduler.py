@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import Counter
+from sexify.core.downloader import DownloadRequest, completed
+from sexify.core.scheduler import LoadBalancer
+
+
+class FakeDownloader:
+    """
+    Tries the routed service, then the others, each in a balancer slot like
+    Downloader._download_from. Records routes and peak concurrency per service.
+    """
+
+    def __init__(self, fail=(), down=()):
+        self.fail = set(fail)
+        self.down = set(down)
+        self.service_slots = None
+        self.routes = []
+        self.peak = Counter()
+        self._active = Counter()
+        self._lock = threading.Lock()
+
+    def attempt(self, service):
+        with self._lock:
+            self._active[service] += 1
+            self.peak[service] = max(self.peak[service], self._active[service])
+        time.sleep(0.02)
+        with self._lock:
+            self._active[service] -= 1
+        return service not in self.down
+
+    def download_track(self, req):
+        first = req.route or req.service
+        with self._lock:
+            self.routes.append(first)
+        if req.isrc in self.fail:
+            raise RuntimeError("boom")
+        for service in [first] + [s for s in ("tidal", "qobuz", "amazon") if s != first]:
+            with self.service_slots(service):
+                if self.attempt(service):
+                    return completed(True)
+        return completed(False)
+
+
+def results(outcomes):
+    return [outcome.result() for outcome in outcomes]
+
+
+def requests_for(n, service="tidal", quality="LOSSLESS"):
+    return [DownloadRequest(isrc=f"ISRC{i}", service=service, audio_format=quality) for i in range(n)]
+
+
+def test_spreads_tracks_within_limits():
+    downloader = FakeDownloader()
+    balancer = LoadBalancer(downloader, {"tidal": 2, "qobuz": 1, "amazon": 1})
+    assert all(results(balancer.run_each(requests_for(12))))
+    assert set(downloader.routes) == {"tidal", "qobuz", "amazon"}
+    assert downloader.peak["tidal"] <= 2
+    assert downloader.peak["qobuz"] <= 1
+    assert downloader.peak["amazon"] <= 1
+
+
+def test_quality_without_equivalent_stays_on_requested_service():
+    downloader = FakeDownloader()
+    balancer = LoadBalancer(downloader, {"tidal": 2, "qobuz": 2})
+    balancer.run_each(requests_for(4, quality="HIGH"))
+    assert set(downloader.routes) == {"tidal"}
+
+
+def test_eligible_services_puts_preferred_first():
+    balancer = LoadBalancer(FakeDownloader(), {"tidal": 1, "qobuz": 1, "amazon": 1})
+    req = DownloadRequest(isrc="X", service="qobuz", audio_format="27")
+    assert balancer.eligible_services(req) == ["qobuz", "tidal", "amazon"]
+
+
+def test_crashed_track_counts_as_failure():
+    downloader = FakeDownloader(fail={"ISRC1"})
+    balancer = LoadBalancer(downloader, {"tidal": 1})
+    assert results(balancer.run_each(requests_for(3))) == [True, False, True]
+
+
+def test_fallbacks_stay_within_the_limits_of_the_service_they_fall_back_to():
+    downloader = FakeDownloader(down={"qobuz"})
+    balancer = LoadBalancer(downloader, {"tidal": 1, "qobuz": 3, "amazon": 1})
+    assert all(results(balancer.run_each(requests_for(10))))
+    assert "qobuz" in downloader.routes
+    assert downloader.peak["tidal"] <= 1
+    assert downloader.peak["amazon"] <= 1
+    assert balancer.in_flight == {"tidal": 0, "qobuz": 0, "amazon": 0}
+    assert downloader.service_slots is None
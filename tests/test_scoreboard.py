@@ -0,0 +1,33 @@
+import pytest
+from sexify.core.scoreboard import ServiceScoreboard
+
+
+@pytest.fixture
+def scoreboard(tmp_path):
+    return ServiceScoreboard(str(tmp_path / "stats.db"))
+
+
+def test_order_keeps_given_order_without_history(scoreboard):
+    assert scoreboard.order("qobuz", ["tidal", "qobuz", "amazon"]) == ["qobuz", "tidal", "amazon"]
+
+
+def test_order_moves_failing_service_back(scoreboard):
+    for _ in range(10):
+        scoreboard.record("tidal", False, 5.0)
+        scoreboard.record("qobuz", True, 1.0, nbytes=30_000_000, seconds=3.0)
+    assert scoreboard.order("tidal", ["tidal", "qobuz", "amazon"])[0] == "qobuz"
+
+
+def test_preferred_service_stays_first_when_only_slightly_slower(scoreboard):
+    for _ in range(10):
+        scoreboard.record("tidal", True, 2.4, nbytes=30_000_000, seconds=3.0)
+        scoreboard.record("qobuz", True, 2.0, nbytes=30_000_000, seconds=3.0)
+    assert scoreboard.order("tidal", ["tidal", "qobuz"]) == ["tidal", "qobuz"]
+
+
+def test_stats_are_laplace_smoothed(scoreboard):
+    scoreboard.record("amazon", True, 1.0, nbytes=100, seconds=1.0)
+    stats = scoreboard.stats("amazon")
+    assert stats["attempts"] == 1
+    assert stats["success_rate"] == pytest.approx(2 / 3)
+    assert stats["throughput"] == 100
@@ -0,0 +1,109 @@
+import http.client
+import json
+import threading
+import time
+import pytest
+from sexify.constants import SERVE_MAX_BODY
+from sexify.core import server
+from sexify.core.downloader import DownloadRequest
+from sexify.core.journal import JobJournal
+from sexify.core.retry import get_retry_policy
+
+
+class StubDownloader:
+    """Stands in for the warm Downloader; the stubbed pipeline never touches it."""
+
+    def __init__(self):
+        self.spotify = None
+        self.journal = None
+
+
+def fake_enumerate(spotify, urls, options):
+    return [DownloadRequest(isrc=f"ISRC{i}", service=options["service"], spotify_id=url)
+            for i, url in enumerate(urls)], 0
+
+
+def wait_for(jobs, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] in (server.DONE, server.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "JobJournal", lambda: JobJournal(str(tmp_path / "journal.db")))
+    monkeypatch.setattr(server, "Downloader", StubDownloader)
+    monkeypatch.setattr(server, "enumerate_requests", fake_enumerate)
+    monkeypatch.setattr(server, "download_all", lambda downloader, reqs, balance: ([True] * len(reqs), 0))
+    jobs = server.JobQueue()
+    yield jobs
+    jobs.stop()
+
+
+def test_each_job_gets_the_full_retry_budget(jobs, monkeypatch):
+    budget = get_retry_policy().budget
+    retries = []
+
+    def failing_download_all(downloader, reqs, balance):
+        spent = 0
+        while budget.spend():
+            spent += 1
+        retries.append(spent)
+        return [False] * len(reqs), 0
+
+    monkeypatch.setattr(server, "download_all", failing_download_all)
+    first = jobs.submit({"urls": ["a"], "service": "tidal"})
+    second = jobs.submit({"urls": ["b"], "service": "tidal"})
+    assert wait_for(jobs, first.id)["status"] == wait_for(jobs, second.id)["status"] == server.DONE
+    assert retries == [budget.limit, budget.limit]
+
+
+@pytest.fixture
+def api(jobs):
+    httpd = server.ThreadingHTTPServer(("127.0.0.1", 0), server.JobRequestHandler)
+    httpd.daemon_threads = True
+    httpd.jobs = jobs
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(address, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())
+    finally:
+        conn.close()
+
+
+def test_submitted_job_runs_and_reports_its_tracks(api):
+    status, job = request(api, "POST", "/jobs", json.dumps({"urls": ["a", "b"], "service": "qobuz"}))
+    assert status == 202 and job["urls"] == ["a", "b"] and job["options"]["service"] == "qobuz"
+
+    deadline = time.monotonic() + 5
+    while job["status"] not in (server.DONE, server.FAILED) and time.monotonic() < deadline:
+        time.sleep(0.01)
+        status, job = request(api, "GET", f"/jobs/{job['id']}")
+    assert status == 200
+    assert job["status"] == server.DONE and job["total"] == 2 and job["succeeded"] == 2
+    assert request(api, "GET", "/jobs")[1]["jobs"][0]["id"] == job["id"]
+    assert request(api, "GET", "/jobs/999")[0] == 404
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", str(SERVE_MAX_BODY + 1)])
+def test_bad_content_length_is_rejected(api, length):
+    status, reply = request(api, "POST", "/jobs", b"{}", {"Content-Length": length})
+    assert status == 400 and "Content-Length" in reply["error"]
+
+
+def test_malformed_submission_is_rejected(api):
+    assert request(api, "POST", "/jobs", b"not json")[0] == 400
+    assert request(api, "POST", "/jobs", json.dumps({"urls": []}))[0] == 400
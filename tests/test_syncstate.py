@@ -0,0 +1,50 @@
+import pytest
+from sexify.core.syncstate import PlaylistSyncState, DOWNLOADED, PRESENT, FAILED, REMOVED
+
+
+@pytest.fixture
+def state(tmp_path):
+    return PlaylistSyncState(str(tmp_path / "sync.db"))
+
+
+def test_snapshot_round_trip(state):
+    assert state.snapshot("p") is None
+    state.set_snapshot("p", "Mix", "snap1")
+    state.set_snapshot("p", "Mix", "snap2")
+    assert state.snapshot("p") == "snap2"
+
+
+def test_tracks_and_failures(state):
+    state.set_track("p", "t1", "I1", "/m/1.flac", DOWNLOADED)
+    assert not state.has_failures("p")
+    state.set_track("p", "t2", "I2", "/m/2.flac", FAILED)
+    assert state.has_failures("p")
+    state.set_track("p", "t2", "I2", "/m/2.flac", DOWNLOADED)
+    assert not state.has_failures("p")
+    assert state.tracks("p") == {"t1": ("I1", "/m/1.flac", DOWNLOADED), "t2": ("I2", "/m/2.flac", DOWNLOADED)}
+    assert state.tracks("other") == {}
+
+
+def test_only_downloaded_tracks_become_prune_candidates(state):
+    state.set_track("p", "mine", "I1", "/m/1.flac", DOWNLOADED)
+    state.set_track("p", "theirs", "I2", "/m/2.flac", PRESENT)
+    state.set_track("p", "broken", "I3", "/m/3.flac", FAILED)
+    state.mark_removed("p", ["mine", "theirs", "broken"])
+    assert state.tracks("p") == {"mine": ("I1", "/m/1.flac", REMOVED)}
+
+
+def test_shared_path_is_in_use(state):
+    state.set_track("p1", "t", "I1", "/m/Mix/1.flac", DOWNLOADED)
+    state.set_track("p2", "t", "I1", "/m/Mix/1.flac", PRESENT)
+    state.mark_removed("p1", ["t"])
+    assert state.path_in_use("/m/Mix/1.flac", "p1", "t")
+
+    state.mark_removed("p2", ["t"])  # Forgotten: p2 never owned the file
+    assert not state.path_in_use("/m/Mix/1.flac", "p1", "t")
+
+
+def test_forget(state):
+    state.set_track("p", "t1", "I1", "/m/1.flac", REMOVED)
+    state.set_track("p", "t2", "I2", "/m/2.flac", DOWNLOADED)
+    state.forget("p", ["t1"])
+    assert list(state.tracks("p")) == ["t2"]